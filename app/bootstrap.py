@@ -0,0 +1,38 @@
+import os, uuid
+from config.settings import ADMIN_EMAILS
+
+os.environ["DATABRICKS_AUTH_TYPE"] = "pat"
+for k in ("DATABRICKS_CLIENT_ID", "DATABRICKS_CLIENT_SECRET"):
+    os.environ.pop(k, None)
+
+import streamlit as st
+
+os.environ.setdefault("DATABRICKS_HOST",  st.secrets["DATABRICKS_HOST"])
+os.environ.setdefault("DATABRICKS_TOKEN", st.secrets["DATABRICKS_TOKEN"])
+os.environ.setdefault("GENIE_SPACE_ID",   st.secrets["GENIE_SPACE_ID"])
+
+
+def require_warehouse():
+    """Every page needs the sql-warehouse binding; stop the script early if missing."""
+    if "WAREHOUSE_ID" not in os.environ:
+        st.error("WAREHOUSE_ID not set. Check app.yaml 'valueFrom: sql-warehouse' binding.")
+        st.stop()
+
+
+def session_id() -> str:
+    """Stable id for the current browser session (keys per-session state)."""
+    return st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+
+def user_id() -> str:
+    """Who is asking: the Databricks Apps forwarded user, else the browser session."""
+    context = getattr(st, "context", None)  # st.context needs streamlit >= 1.37
+    email = context.headers.get("X-Forwarded-Email") if context is not None else None
+    return email or session_id()
+
+
+def require_admin():
+    """Stop the page unless the forwarded user is listed in ADMIN_EMAILS."""
+    if user_id().lower() not in ADMIN_EMAILS:
+        st.error("This page is restricted to app admins (ADMIN_EMAILS).")
+        st.stop()
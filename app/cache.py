@@ -0,0 +1,286 @@
+import datetime as _dt
+import io, json, logging, os, sqlite3, threading, time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from config.settings import (
+    CACHE_BACKEND, CACHE_PATH, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_MAX_ENTRY_BYTES,
+    CACHE_SQLITE_JOURNAL_MODE,
+)
+
+log = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Byte-oriented key/value store with optional per-entry TTL (seconds)."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float | None = None): ...
+
+    @abstractmethod
+    def delete(self, key: str): ...
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str): ...
+
+
+class MemoryCache(CacheBackend):
+    """Per-process LRU (what every replica had before), bounded by entries and bytes."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, tuple[float | None, bytes]]" = OrderedDict()
+
+    def _pop(self, key):
+        _, value = self._data.pop(key)
+        self.nbytes -= len(value)
+
+    def get(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            expires, value = hit
+            if expires is not None and expires <= time.time():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        if len(value) > self.max_bytes:
+            return  # would evict everything else and still not fit
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (expires, value)
+            self.nbytes += len(value)
+            while len(self._data) > self.max_entries or self.nbytes > self.max_bytes:
+                self._pop(next(iter(self._data)))
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                self._pop(key)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Shared store in a single SQLite file, e.g. on a volume mounted by every
+    replica. Uses the rollback journal by default: WAL needs shared memory
+    and is only safe when all replicas run on one host.
+    Values over `max_entry_bytes` are not stored. SQLite errors (locked or
+    full volume, corrupt file) are logged and treated as a miss: the cache
+    never fails the query it sits in front of.
+    """
+
+    # reads refresh `accessed` (the LRU clock) at most this often per key,
+    # so cache hits don't turn into writes to the shared file
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = CACHE_MAX_ENTRIES,
+                 journal_mode: str = CACHE_SQLITE_JOURNAL_MODE,
+                 max_entry_bytes: int = CACHE_MAX_ENTRY_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self.journal_mode = journal_mode
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " expires REAL, accessed REAL NOT NULL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            if self.journal_mode.upper() == "WAL":
+                conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        try:
+            return self._get(key)
+        except sqlite3.Error:
+            log.exception("cache read failed for %s", key)
+            return None
+
+    def _get(self, key):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires, accessed FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires, accessed = row
+        if expires is not None and expires <= now:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            return None
+        if now - accessed >= self.TOUCH_INTERVAL:
+            conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        return value
+
+    def set(self, key, value, ttl=None):
+        if len(value) > self.max_entry_bytes:
+            return
+        try:
+            self._set(key, value, ttl)
+        except sqlite3.Error:
+            log.exception("cache write failed for %s", key)
+
+    def _set(self, key, value, ttl):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+            (key, value, now + ttl if ttl else None, now),
+        )
+        # cheap housekeeping: drop expired rows, then the least recently used overflow
+        conn.execute("DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?", (now,))
+        conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            " SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix):
+        self._conn().execute(
+            "DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> CacheBackend:
+    """Process-wide backend chosen by CACHE_BACKEND ("memory" or "sqlite")."""
+    if CACHE_BACKEND == "sqlite":
+        return SQLiteCache(CACHE_PATH)
+    return MemoryCache()
+
+
+# ---- serialization ----
+# Only data formats go into the shared store (never pickle): whoever can
+# write the volume must not be able to run code in the replicas reading it.
+
+_META_KEY = b"app.meta"
+
+
+def dumps_df(pdf, meta: dict | None = None) -> bytes:
+    """DataFrame (+ optional JSON-able `meta`) -> zstd-compressed Parquet bytes."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(pdf, preserve_index=False)
+    extra = {}
+    if pdf.attrs:
+        extra[b"PANDAS_ATTRS"] = json.dumps(pdf.attrs)   # as DataFrame.to_parquet writes them
+    if meta is not None:
+        extra[_META_KEY] = dumps_json(meta)
+    if extra:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **extra})
+    buf = io.BytesIO()
+    pq.write_table(table, buf, compression="zstd")
+    return buf.getvalue()
+
+
+def loads_df(blob: bytes):
+    import pandas as pd
+
+    return pd.read_parquet(io.BytesIO(blob), engine="pyarrow")
+
+
+def loads_df_meta(blob: bytes):
+    """Inverse of dumps_df(pdf, meta): (DataFrame, meta or None)."""
+    import pyarrow.parquet as pq
+
+    raw = (pq.read_schema(io.BytesIO(blob)).metadata or {}).get(_META_KEY)
+    return loads_df(blob), (loads_json(raw) if raw is not None else None)
+
+
+def _json_default(value):
+    if isinstance(value, _dt.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, _dt.date):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _json_hook(obj: dict):
+    if len(obj) == 1:
+        if "$date" in obj:
+            return _dt.date.fromisoformat(obj["$date"])
+        if "$datetime" in obj:
+            return _dt.datetime.fromisoformat(obj["$datetime"])
+    return obj
+
+
+def dumps_json(value) -> bytes:
+    """JSON with dates/datetimes as tagged ISO strings; tuples come back as lists."""
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads_json(blob: bytes):
+    return json.loads(blob, object_hook=_json_hook)
+
+
+def ttl_cache(seconds: float):
+    """
+    Memoize on the positional args for `seconds`: an in-process memo in front
+    of the shared backend, so one replica's result is reused by the others.
+    Values are stored as JSON (dates allowed); keep them small.
+    `cache_clear()` drops both the memo and this function's backend entries.
+    """
+    def deco(fn):
+        lock = threading.Lock()
+        local = {}
+        prefix = f"fn:{fn.__module__}.{fn.__qualname__}:"
+
+        @wraps(fn)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                hit = local.get(args)
+                if hit and hit[0] > now:
+                    return hit[1]
+            key = prefix + repr(args)
+            blob = get_cache().get(key)
+            try:
+                value = loads_json(blob) if blob is not None else None
+            except ValueError:
+                blob = None   # written in an older format: recompute
+            if blob is None:
+                value = fn(*args)
+                get_cache().set(key, dumps_json(value), ttl=seconds)
+            with lock:
+                local[args] = (now + seconds, value)
+            return value
+
+        def cache_clear():
+            with lock:
+                local.clear()
+            get_cache().delete_prefix(prefix)
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return deco
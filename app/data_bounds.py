@@ -1,14 +1,20 @@
-from functools import lru_cache
-import pandas as pd
-from config.settings import FQTN
-from app.db import get_conn
+import datetime as _dt
+from config.settings import FQTN, DATE_BOUNDS_TTL
+from app.db import fetch_rows
+from app.cache import ttl_cache
 
-@lru_cache(maxsize=1)
+def _as_date(v) -> _dt.date:
+    if isinstance(v, _dt.datetime):
+        return v.date()
+    if isinstance(v, _dt.date):
+        return v
+    return _dt.datetime.fromisoformat(str(v)).date()
+
+@ttl_cache(DATE_BOUNDS_TTL)
 def get_date_bounds():
-    with get_conn().cursor() as cur:
-        cur.execute(
-            f"SELECT CAST(min(order_date) AS date), CAST(max(order_date) AS date) FROM {FQTN}"
-        )
-        lo, hi = cur.fetchone()
-    # keep behavior identical to your app.py
-    return pd.to_datetime(lo).date(), pd.to_datetime(hi).date()
+    rows, _ = fetch_rows(
+        f"SELECT CAST(min(order_date) AS date), CAST(max(order_date) AS date) FROM {FQTN}"
+    )
+    lo, hi = rows[0]
+    # keep behavior identical to your app.py (without pulling in pandas)
+    return _as_date(lo), _as_date(hi)
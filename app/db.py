@@ -1,5 +1,8 @@
-import os
-import databricks.sql as dbsql
+import os, threading, time
+from collections import deque
+from contextlib import contextmanager
+from config.settings import WAREHOUSE_POOL_SIZE, WAREHOUSE_CONN_IDLE_SECONDS
+from app.normalize import normalize_result
 
 def _server_hostname_from_host(url: str) -> str:
     return url.replace("https://", "").rstrip("/")
@@ -8,9 +11,101 @@ def get_conn():
     host = os.environ["DATABRICKS_HOST"]
     token = os.environ["DATABRICKS_TOKEN"]
     wh_id = os.environ["WAREHOUSE_ID"]
+    import databricks.sql as dbsql  # deferred: first query, not app start
 
     return dbsql.connect(
         server_hostname=_server_hostname_from_host(host),
         http_path=f"/sql/1.0/warehouses/{wh_id}",
         access_token=token,
     )
+
+# Idle (connection, last_used) pairs, reused LIFO; at most WAREHOUSE_POOL_SIZE
+# checked out at once. Connections idle past WAREHOUSE_CONN_IDLE_SECONDS are closed.
+_idle: "deque[tuple[object, float]]" = deque()
+_idle_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(WAREHOUSE_POOL_SIZE)
+
+def _close(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+def _checkout():
+    expired = []
+    cutoff = time.monotonic() - WAREHOUSE_CONN_IDLE_SECONDS
+    with _idle_lock:
+        while _idle and _idle[0][1] < cutoff:
+            expired.append(_idle.popleft()[0])
+        conn = _idle.pop()[0] if _idle else None
+    for old in expired:
+        _close(old)
+    return get_conn() if conn is None else conn
+
+def _checkin(conn):
+    with _idle_lock:
+        _idle.append((conn, time.monotonic()))
+
+@contextmanager
+def pooled_conn(fresh: bool = False):
+    """Borrow a warehouse connection; blocks while the pool is exhausted.
+    `fresh` skips idle connections and opens a new one."""
+    _slots.acquire()
+    try:
+        conn = get_conn() if fresh else _checkout()
+        try:
+            yield conn
+        except Exception as e:
+            # a failed query leaves the session usable; a dead one isn't
+            # handed to the next caller
+            if _connection_lost(e):
+                _close(conn)
+            else:
+                _checkin(conn)
+            raise
+        except BaseException:
+            _close(conn)   # interrupted mid-call: state unknown
+            raise
+        _checkin(conn)
+    finally:
+        _slots.release()
+
+def _connection_lost(exc: Exception) -> bool:
+    """Errors from a dead session/transport, as opposed to the query itself."""
+    try:
+        from databricks.sql import exc as dbexc
+    except ImportError:
+        return False
+    # the connector's own retries gave up, or the request may already have
+    # run: neither means the session is dead, and running it again is unsafe
+    gave_up = tuple(getattr(dbexc, name) for name in
+                    ("UnsafeToRetryError", "MaxRetryDurationError") if hasattr(dbexc, name))
+    if gave_up and isinstance(exc, gave_up):
+        return False
+    if isinstance(exc, (dbexc.OperationalError, dbexc.InterfaceError)):
+        return True
+    return isinstance(exc, dbexc.DatabaseError) and "session" in str(exc).lower()
+
+def _execute(sql_text: str, fresh: bool = False):
+    with pooled_conn(fresh) as conn, conn.cursor() as cur:
+        cur.execute(sql_text)
+        return cur.fetchall(), cur.description
+
+def fetch_rows(sql_text: str):
+    """(rows, cursor.description); retried once on a new connection if the
+    pooled one turns out to be dead (e.g. its warehouse session expired)."""
+    try:
+        return _execute(sql_text)
+    except Exception as e:
+        if not _connection_lost(e):
+            raise
+        return _execute(sql_text, fresh=True)
+
+def rows_to_df(rows, description):
+    """Connector rows + cursor.description -> normalized DataFrame."""
+    import pandas as pd
+
+    return normalize_result(pd.DataFrame(rows, columns=[d[0] for d in description]))
+
+def fetch_df(sql_text: str):
+    return rows_to_df(*fetch_rows(sql_text))
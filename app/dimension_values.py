@@ -0,0 +1,78 @@
+import logging, re, time
+from config.settings import FQTN, DIMENSION_VALUES_TTL, DIMENSION_VALUES_SOURCE, SUPERSTORE_PATH
+from config.registry import REGISTRY
+from app.db import fetch_rows
+from app.cache import ttl_cache
+from app.scheduler import SCHEDULER, Ticket, PRIORITY_CHEAP
+
+log = logging.getLogger(__name__)
+
+# after a failed load, page loads keep the current values this long before retrying
+_RETRY_AFTER_FAILURE = 60
+
+def _col_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+def _load_from_warehouse(dims: list[str]) -> dict[str, list[str]]:
+    sql_text = " UNION ALL ".join(
+        f"SELECT DISTINCT '{d}' AS dim, CAST({REGISTRY.dim_column[d]} AS string) AS value "
+        f"FROM {FQTN} WHERE {REGISTRY.dim_column[d]} IS NOT NULL"
+        for d in dims
+    )
+    values = {d: [] for d in dims}
+    with SCHEDULER.slot(Ticket("system", PRIORITY_CHEAP)):
+        rows, _ = fetch_rows(sql_text)
+    for dim, value in rows:
+        values[dim].append(value)
+    return values
+
+def load_local_dimension_values(path: str = SUPERSTORE_PATH, dims: list[str] | None = None) -> dict[str, list[str]]:
+    """Same shape as the warehouse load, read from the bundled Superstore extract."""
+    import pandas as pd
+
+    dims = dims or REGISTRY.value_dimensions
+    reader = pd.read_parquet if path.endswith(".parquet") else pd.read_excel
+    pdf = reader(path)
+    # "Sub-Category" -> subcategory, "Customer Name" -> customer_name, ...
+    by_key = {_col_key(c): c for c in pdf.columns}
+    values = {}
+    for d in dims:
+        src = by_key.get(_col_key(REGISTRY.dim_column[d]))
+        if src is not None:
+            values[d] = pdf[src].dropna().astype(str).unique().tolist()
+    return values
+
+@ttl_cache(DIMENSION_VALUES_TTL)
+def _load_dimension_values() -> dict[str, list[str]]:
+    dims = REGISTRY.value_dimensions
+    if not dims:
+        return {}
+    if DIMENSION_VALUES_SOURCE == "local":
+        return load_local_dimension_values(dims=dims)
+    return _load_from_warehouse(dims)
+
+_applied = None
+_failed_at = None
+
+def get_dimension_values() -> dict[str, list[str]]:
+    """
+    Distinct values of every registry dimension marked `load_values`,
+    fetched in one round-trip (or from another replica via the shared cache)
+    and pushed into the registry, which also rebuilds the rules provider's
+    fuzzy value index. If the load fails, the registry keeps the values it
+    has (last load, else the semantic-layer defaults) and the page carries on.
+    """
+    global _applied, _failed_at
+    if _failed_at is not None and time.monotonic() - _failed_at < _RETRY_AFTER_FAILURE:
+        return REGISTRY.all_dimension_values()
+    try:
+        values = _load_dimension_values()
+    except Exception:
+        log.exception("Loading dimension values failed; keeping the current ones")
+        _failed_at = time.monotonic()
+        return REGISTRY.all_dimension_values()
+    _failed_at = None
+    if values is not _applied:
+        REGISTRY.set_dimension_values(values)
+        _applied = values
+    return values
@@ -1,50 +1,44 @@
-import os
-
-os.environ["DATABRICKS_AUTH_TYPE"] = "pat"
-for k in ("DATABRICKS_CLIENT_ID", "DATABRICKS_CLIENT_SECRET"):
-    os.environ.pop(k, None)
-
+import app.bootstrap as bootstrap
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 
-os.environ.setdefault("DATABRICKS_HOST",  st.secrets["DATABRICKS_HOST"])
-os.environ.setdefault("DATABRICKS_TOKEN", st.secrets["DATABRICKS_TOKEN"])
-os.environ.setdefault("GENIE_SPACE_ID",   st.secrets["GENIE_SPACE_ID"])
+from config.settings import FQTN, PREVIEW_SAMPLE_PERCENT
 
-import pandas as pd
-from config.settings import FQTN
-
-from app.db import get_conn
 from app.data_bounds import get_date_bounds
-from app.ui import render_form, render_results, render_quick_chart, render_download
-from app.utils import is_safe_select, expand_table
-from providers import genie_provider
-#from providers.rules_provider import translate as rules_translate
+from app.dimension_values import get_dimension_values
+from app.ui import (render_form, render_results, render_quick_chart, render_download,
+                    wait_with_queue_status)
+from app.utils import is_safe_select
+from app.pipeline import translate_question, execute, priority_for, preview_sql, execute_preview
+from app.scheduler import SCHEDULER, Ticket, PRIORITY_CHEAP
+from app.result_store import RESULTS
+from providers import router
 
-if "WAREHOUSE_ID" not in os.environ:
-    st.error("WAREHOUSE_ID not set. Check app.yaml 'valueFrom: sql-warehouse' binding.")
-    st.stop()
+bootstrap.require_warehouse()
 
 st.set_page_config(page_title="Superstore + Genie", layout="wide")
 st.title("Ask Genie")
 st.caption(f"Querying: `{FQTN}` via SQL Warehouse")
 
 DATA_MIN, DATA_MAX = get_date_bounds()  # cached; same semantics as your version
+get_dimension_values()                  # TTL-cached; refreshes registry filter values
+
+SESSION_ID = bootstrap.session_id()
+RESULTS.attach(st.session_state, SESSION_ID)
 
-user_q, submitted = render_form(default_example="Show sales by month")
+user_q, submitted, preview = render_form(default_example="Show sales by month")
 
 if submitted and user_q.strip():
     q = user_q.strip()
-    is_manual = q.lower().startswith(("select", "with"))
 
-    if is_manual:
-        sql_text = q
-        provider_used = "Manual SQL"
-    else:
-        with st.spinner("Asking Genie..."):
-            sql_text = genie_provider.translate(q, FQTN, DATA_MIN, DATA_MAX)
-        provider_used = "Genie (stub)"
+    try:
+        with st.spinner("Translating..."):
+            sql_text, provider_used, spec = translate_question(
+                q, DATA_MIN, DATA_MAX, session_id=SESSION_ID)
+    except ValueError as ve:
+        st.warning(str(ve))
+        st.stop()
 
-    sql_text = expand_table(sql_text)
     if not is_safe_select(sql_text):
         st.error("Only read-only single-statement SELECTs are allowed.")
         st.stop()
@@ -52,21 +46,73 @@ if submitted and user_q.strip():
     st.caption(f"Provider: {provider_used}")
     st.code(sql_text, language="sql")
 
-    # Execute
+    # Execute (in the background so the queue position can be shown meanwhile).
+    # With "Fast preview", a sampled estimate runs alongside and is shown until
+    # the exact result replaces it.
+    ticket = Ticket(bootstrap.user_id(), priority_for(provider_used))
+    sampled_sql = preview_sql(sql_text, spec) if preview else None
+    preview_area = st.empty()
+    # Not a `with` block: a preview still running when the exact result lands
+    # is abandoned rather than waited for, and its ticket cancelled so a
+    # preview still queued never takes a warehouse slot.
+    ex = ThreadPoolExecutor(max_workers=2)
+    est_ticket = Ticket(ticket.user, PRIORITY_CHEAP) if sampled_sql else None
     try:
-        with get_conn().cursor() as cur:
-            cur.execute(sql_text)
-            rows = cur.fetchall()
-            cols = [d[0] for d in cur.description]
-        pdf = pd.DataFrame(rows, columns=cols)
+        exact = ex.submit(execute, sql_text, spec, ticket)
+        if sampled_sql:
+            est_fut = ex.submit(execute_preview, sql_text, sampled_sql, est_ticket)
+            try:
+                est = wait_with_queue_status(est_fut, est_ticket, SCHEDULER,
+                                             until=exact, label="Preview: ")
+            except Exception as e:
+                est = None
+                preview_area.caption(f"Preview unavailable: {e}")
+            if est is not None and not est.empty and not exact.done():
+                with preview_area.container():
+                    st.warning(f"Approximate: estimated from a {PREVIEW_SAMPLE_PERCENT:g}% sample "
+                               "(sums and counts scaled up; averages, ratios and distinct counts "
+                               "as sampled). The exact result replaces it when ready.")
+                    render_results(est)
+                    render_quick_chart(est)
+        pdf = wait_with_queue_status(exact, ticket, SCHEDULER)
     except Exception as e:
+        preview_area.empty()
         st.error(f"Query failed: {e}")
         st.stop()
+    finally:
+        if est_ticket is not None:
+            SCHEDULER.cancel(est_ticket)
+        ex.shutdown(wait=False)
+    preview_area.empty()
 
     if pdf.empty:
+        RESULTS.release(SESSION_ID)
         st.info("No rows returned.")
         st.stop()
 
+    RESULTS.put(SESSION_ID, pdf, sql_text=sql_text, provider_used=provider_used,
+                queue_wait=ticket.waited, previewed=bool(sampled_sql))
+
+# The session's last result survives reruns (e.g. the download button) but is
+# owned by the process-wide manager, which may spill it to disk under pressure.
+last = RESULTS.get(SESSION_ID)
+if last is not None:
+    pdf, meta = last
+    if not submitted:
+        st.caption(f"Provider: {meta['provider_used']}")
+        st.code(meta["sql_text"], language="sql")
+
+    notes = []
+    if meta.get("previewed"):
+        notes.append("Exact result")
+    if meta.get("queue_wait"):
+        notes.append(f"Queue wait: {meta['queue_wait']:.1f}s")
+    mem = pdf.attrs.get("memory")
+    if mem:
+        notes.append(f"Result memory: {mem['before'] / 1024:,.0f} KiB → {mem['after'] / 1024:,.0f} KiB")
+    if notes:
+        st.caption(" · ".join(notes))
+
     # Render outputs
     render_results(pdf)
     render_quick_chart(pdf)
@@ -77,5 +123,10 @@ with st.expander("How this works"):
     st.markdown(
         "- Uses DB_HOST, DB_HTTP_PATH, and DB_TOKEN (env).\n"
         "- Catalog/Schema/Table via env (default main.retail.superstore_silver).\n"
-        "- The NL→SQL rules come from a provider module you can swap out for Genie."
+        "- The NL→SQL rules come from a provider module you can swap out for Genie.\n"
+        "- Questions try the rules engine first and only go to Genie when it has no match."
     )
+    tier_stats = router.stats()
+    if tier_stats:
+        st.caption("Translation tiers (this process)")
+        st.dataframe(tier_stats, use_container_width=True)
@@ -0,0 +1,46 @@
+import datetime as _dt
+from decimal import Decimal
+from config.settings import CATEGORY_MAX_UNIQUE_RATIO
+
+
+def _first_valid(s):
+    idx = s.first_valid_index()
+    return None if idx is None else s.loc[idx]
+
+
+def normalize_result(pdf):
+    """
+    Compact a freshly fetched result in place of the connector's object columns:
+    Decimal -> float64, date/datetime -> datetime64, low-cardinality strings ->
+    category, integers downcast to the smallest fitting width.
+
+    Memory before/after (bytes, deep) is recorded in pdf.attrs["memory"], and
+    pdf.attrs["normalized"] tells renderers not to re-coerce.
+    """
+    import pandas as pd
+
+    before = int(pdf.memory_usage(deep=True, index=False).sum())
+    out = {}
+    for col in pdf.columns:
+        s = pdf[col]
+        try:
+            if pd.api.types.is_integer_dtype(s) and not pd.api.types.is_bool_dtype(s):
+                s = pd.to_numeric(s, downcast="integer")
+            elif s.dtype == object or pd.api.types.is_string_dtype(s):
+                first = _first_valid(s)
+                if isinstance(first, Decimal):
+                    s = pd.to_numeric(s).astype("float64")
+                elif isinstance(first, (_dt.date, _dt.datetime)):
+                    s = pd.to_datetime(s)
+                elif isinstance(first, str) and len(s) > 1:
+                    if s.nunique(dropna=True) <= CATEGORY_MAX_UNIQUE_RATIO * len(s):
+                        s = s.astype("category")
+        except (ValueError, TypeError):
+            pass  # mixed column; leave it as the connector returned it
+        out[col] = s
+
+    norm = pd.DataFrame(out, index=pdf.index)
+    after = int(norm.memory_usage(deep=True, index=False).sum())
+    norm.attrs["normalized"] = True
+    norm.attrs["memory"] = {"before": before, "after": after}
+    return norm
@@ -0,0 +1,78 @@
+import app.bootstrap as bootstrap
+import json, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import streamlit as st
+
+from config.settings import FQTN, DASHBOARD_PATH, WAREHOUSE_POOL_SIZE
+
+from app.data_bounds import get_date_bounds
+from app.dimension_values import get_dimension_values
+from app.ui import render_quick_chart
+from app.utils import is_safe_select
+from app.pipeline import translate_question, execute, priority_for
+from app.scheduler import Ticket
+
+bootstrap.require_warehouse()
+
+st.set_page_config(page_title="Superstore dashboard", layout="wide")
+st.title("Dashboard")
+st.caption(f"Querying: `{FQTN}` via SQL Warehouse · up to {WAREHOUSE_POOL_SIZE} panels in parallel")
+
+DATA_MIN, DATA_MAX = get_date_bounds()
+get_dimension_values()
+
+with open(DASHBOARD_PATH, encoding="utf-8") as f:
+    saved_questions = json.load(f)
+
+with st.form("dashboard_form"):
+    text = st.text_area("One question (or SELECT) per line:",
+                        value="\n".join(saved_questions), height=220)
+    submitted = st.form_submit_button("Run dashboard")
+
+
+USER_ID = bootstrap.user_id()
+
+
+def run_panel(q: str):
+    """Translate + execute one panel; runs on a worker thread (no st.* calls here)."""
+    t0 = time.perf_counter()
+    sql_text, provider_used, spec = translate_question(q, DATA_MIN, DATA_MAX)
+    if not is_safe_select(sql_text):
+        raise ValueError("Only read-only single-statement SELECTs are allowed.")
+    ticket = Ticket(USER_ID, priority_for(provider_used))
+    pdf = execute(sql_text, spec, ticket)
+    return sql_text, provider_used, pdf, time.perf_counter() - t0, ticket.waited
+
+
+if submitted:
+    questions = [line.strip() for line in text.splitlines() if line.strip()]
+
+    # Lay out every panel up front so results can land in any order.
+    grid = st.columns(2)
+    panels = []
+    for i, q in enumerate(questions):
+        box = grid[i % 2].container(border=True)
+        box.markdown(f"**{q}**")
+        panels.append(box.empty())
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WAREHOUSE_POOL_SIZE) as pool:
+        futures = {pool.submit(run_panel, q): i for i, q in enumerate(questions)}
+        for fut in as_completed(futures):
+            with panels[futures[fut]].container():
+                try:
+                    sql_text, provider_used, pdf, elapsed, waited = fut.result()
+                except Exception as e:
+                    st.error(f"Panel failed: {e}")
+                    continue
+                st.caption(f"Provider: {provider_used} · {elapsed:.1f}s "
+                           f"(queued {waited:.1f}s) · {len(pdf):,} rows")
+                if pdf.empty:
+                    st.info("No rows returned.")
+                    continue
+                render_quick_chart(pdf)
+                with st.expander("SQL and data"):
+                    st.code(sql_text, language="sql")
+                    st.dataframe(pdf, use_container_width=True)
+
+    st.caption(f"{len(questions)} panels in {time.perf_counter() - t_start:.1f}s")
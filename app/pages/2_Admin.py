@@ -0,0 +1,45 @@
+import app.bootstrap as bootstrap
+import streamlit as st
+
+from app.result_store import RESULTS
+from app.scheduler import SCHEDULER
+from providers import router
+
+bootstrap.require_warehouse()
+
+st.set_page_config(page_title="Superstore admin", layout="wide")
+bootstrap.require_admin()
+st.title("Admin")
+st.caption("Figures are for this app process only.")
+
+st.subheader("Session results")
+usage = RESULTS.usage()
+mib = 1024 * 1024
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("In memory", f"{usage['in_memory_bytes'] / mib:,.1f} MiB",
+          help=f"Budget {usage['budget_bytes'] / mib:,.0f} MiB")
+c2.metric("Budget used", f"{usage['in_memory_bytes'] / max(usage['budget_bytes'], 1):.0%}")
+c3.metric("Sessions", usage["sessions"], help=f"{usage['spilled']} spilled to disk")
+c4.metric("Spills / reloads", f"{usage['spills']} / {usage['reloads']}")
+if usage["entries"]:
+    st.dataframe(usage["entries"], use_container_width=True)
+
+st.subheader("Warehouse queue")
+q = SCHEDULER.metrics()
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Running", f"{q['running']} / {q['max_concurrency']}", help=f"{q['users_running']} users")
+c2.metric("Queue depth", q["queue_depth"],
+          help=f"cheap {q['queue_depth_cheap']}, ad hoc {q['queue_depth_adhoc']}; max {q['max_queue_depth']}")
+c3.metric("Avg wait (cheap)", f"{q['avg_wait_s_cheap']:.1f}s")
+c4.metric("Avg wait (ad hoc)", f"{q['avg_wait_s_adhoc']:.1f}s", help=f"{q['admitted']} queries admitted, {q['cancelled']} cancelled")
+
+st.subheader("Translation tiers")
+tier_stats = router.stats()
+if tier_stats:
+    st.dataframe(tier_stats, use_container_width=True)
+else:
+    st.info("No questions translated yet.")
+
+if st.button("Release idle results now"):
+    RESULTS.sweep_idle()
+    st.rerun()
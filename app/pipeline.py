@@ -0,0 +1,164 @@
+import hashlib, re
+from functools import partial
+from config.registry import REGISTRY
+from config.settings import (
+    FQTN, RESULT_CACHE_TTL, RESULT_CACHE_MAX_ROWS, RESULT_CACHE_MAX_MB, TRANSLATION_CACHE_TTL,
+)
+from app.cache import get_cache, dumps_df, loads_df
+from app.db import fetch_df
+from app.scheduler import SCHEDULER, Ticket, PRIORITY_CHEAP, PRIORITY_ADHOC
+from app.timeseries_store import get_series
+from app.sampling import sample_sql, scale_estimate, additive_columns
+from app.utils import expand_table
+from providers import genie_provider, router
+from providers.rules_provider import TimeSeriesSpec
+
+
+def _cache_key(kind: str, *parts) -> str:
+    return f"{kind}:" + hashlib.sha1("\x1f".join(map(str, parts)).encode()).hexdigest()
+
+
+def is_manual_sql(q: str) -> bool:
+    return q.lower().startswith(("select", "with"))
+
+
+# "and by region?", "what about 2016", "same for profit", "break that down by month"
+_FOLLOW_UP_RE = re.compile(
+    r"^\s*(?:and|but|also|then|what about|how about|same|instead"
+    r"|break (?:it|that|this|those|these) down|it|that|those|these|them)\b",
+    re.IGNORECASE,
+)
+# "only the west", "just 2016", "now by month": refinements, unless the
+# question names a metric or dimension of its own ("only sales in west")
+_REFINE_RE = re.compile(r"^\s*(?:only|just|now|ok(?:ay)?)\b", re.IGNORECASE)
+
+
+def is_follow_up(q: str) -> bool:
+    """Phrasing that only makes sense given the previous question."""
+    if _FOLLOW_UP_RE.search(q):
+        return True
+    if not _REFINE_RE.search(q):
+        return False
+    q = q.lower()
+    return not (REGISTRY.metric_alias_re.search(q)
+                or any(pat.search(q) for pat, _ in REGISTRY.dim_patterns))
+
+
+def _genie_cache_key(q: str, fqtn: str, data_min, data_max) -> str:
+    return _cache_key("genie", " ".join(q.lower().split()), fqtn, data_min, data_max)
+
+
+# Shared translations are only valid for context-free questions: a session
+# with a live Genie conversation may be asking a follow-up ("and by region?").
+
+def _genie_cache_tier(q: str, fqtn: str, data_min, data_max, session_id=None) -> str | None:
+    if genie_provider.has_conversation(session_id):
+        return None
+    blob = get_cache().get(_genie_cache_key(q, fqtn, data_min, data_max))
+    return blob.decode("utf-8") if blob is not None else None
+
+
+def _genie_tier(q: str, fqtn: str, data_min, data_max, session_id=None) -> str:
+    fresh = not genie_provider.has_conversation(session_id)
+    sql_text = genie_provider.translate(q, fqtn, data_min, data_max, session_id=session_id)
+    if fresh:
+        get_cache().set(_genie_cache_key(q, fqtn, data_min, data_max),
+                        sql_text.encode("utf-8"), ttl=TRANSLATION_CACHE_TTL)
+    return sql_text
+
+
+def _tiers(session_id: str | None, q: str = ""):
+    """Rules first (microseconds), then translations another session/replica
+    already paid Genie for, then Genie itself. A follow-up in a session with
+    a live Genie conversation goes straight to Genie, which has the context."""
+    if genie_provider.has_conversation(session_id) and is_follow_up(q):
+        return [("genie", partial(_genie_tier, session_id=session_id))]
+    return [
+        ("rules", partial(router.rules_tier, as_spec=True)),
+        ("genie-cache", partial(_genie_cache_tier, session_id=session_id)),
+        ("genie", partial(_genie_tier, session_id=session_id)),
+    ]
+_PROVIDER_LABEL = {"rules": "Rules", "genie-cache": "Genie (cached)", "genie": "Genie"}
+
+
+def translate_question(q: str, data_min, data_max, session_id: str | None = None):
+    """
+    Question -> (sql_text, provider_used, spec).
+
+    `spec` is the rules TimeSeriesSpec when the question is a time series the
+    incremental store can serve, else None. Raises RulesRefusal (a ValueError)
+    when the rules engine refuses the question (e.g. a year outside the data range).
+    With a `session_id`, Genie questions continue that session's conversation.
+    """
+    if is_manual_sql(q):
+        return expand_table(q), "Manual SQL", None
+
+    answer, tier = router.translate(q, FQTN, data_min, data_max, tiers=_tiers(session_id, q))
+    if isinstance(answer, TimeSeriesSpec):
+        return answer.sql(), "Rules (incremental time series)", answer
+    return expand_table(answer), _PROVIDER_LABEL[tier], None
+
+
+def priority_for(provider_used: str) -> int:
+    """Rules-generated aggregates are cheap; anything hand- or Genie-written is ad hoc."""
+    return PRIORITY_CHEAP if provider_used.startswith("Rules") else PRIORITY_ADHOC
+
+
+def _scheduled_fetch(ticket: Ticket, sql_text: str):
+    with SCHEDULER.slot(ticket):
+        return fetch_df(sql_text)
+
+
+def _cacheable(pdf) -> bool:
+    """Small enough to encode on the request path (row count first: it's free)."""
+    if len(pdf) > RESULT_CACHE_MAX_ROWS:
+        return False
+    return pdf.memory_usage(deep=True).sum() <= RESULT_CACHE_MAX_MB * 1024 * 1024
+
+
+def execute(sql_text: str, spec=None, ticket: Ticket | None = None):
+    """
+    Run a validated query. Cache hits return immediately; warehouse round-trips
+    wait for a scheduler slot under `ticket` (user + priority).
+    """
+    if ticket is None:
+        ticket = Ticket("anonymous", PRIORITY_CHEAP if spec else PRIORITY_ADHOC)
+    fetch = partial(_scheduled_fetch, ticket)
+
+    if spec:
+        return get_series(spec, fetch=fetch)
+
+    cache = get_cache()
+    key = _cache_key("result", sql_text)
+    blob = cache.get(key)
+    if blob is not None:
+        return loads_df(blob)
+
+    pdf = fetch(sql_text)
+    if not _cacheable(pdf):
+        return pdf
+    try:
+        cache.set(key, dumps_df(pdf), ttl=RESULT_CACHE_TTL)
+    except (ValueError, TypeError, NotImplementedError):
+        pass  # column types Parquet can't hold; just don't share this one
+    return pdf
+
+
+
+def has_cached_result(sql_text: str) -> bool:
+    return get_cache().get(_cache_key("result", sql_text)) is not None
+
+
+def preview_sql(sql_text: str, spec=None) -> str | None:
+    """Sampled rewrite for a fast preview, or None when a preview wouldn't help."""
+    if spec or has_cached_result(sql_text):
+        return None   # incremental store / shared cache already answer fast
+    if additive_columns(sql_text) is None:
+        return None   # can't tell which columns to scale: no estimate beats a wrong one
+    return sample_sql(sql_text)
+
+
+def execute_preview(sql_text: str, sampled_sql: str, ticket: Ticket | None = None):
+    """Run the sampled query (cheap priority, never cached) and scale it up."""
+    ticket = ticket or Ticket("anonymous", PRIORITY_CHEAP)
+    return scale_estimate(_scheduled_fetch(ticket, sampled_sql), sql_text)
@@ -0,0 +1,209 @@
+import os, threading, time, uuid, weakref
+from collections import OrderedDict
+from config.settings import RESULT_MEMORY_BUDGET_MB, RESULT_SPILL_DIR, RESULT_IDLE_SECONDS
+from app.cache import dumps_df, loads_df
+
+
+class _Entry:
+    # state: "memory" -> "spilling" (write in flight, pdf still held) -> "spilled"
+    #        -> "loading" (read in flight) -> "memory"
+    __slots__ = ("pdf", "nbytes", "path", "viewed", "meta", "state", "loaded")
+
+    def __init__(self, pdf, nbytes: int, meta: dict):
+        self.pdf = pdf
+        self.nbytes = nbytes
+        self.path = None
+        self.viewed = time.time()
+        self.meta = meta
+        self.state = "memory"
+        self.loaded = None   # threading.Event while loading
+
+
+class _SessionHandle:
+    """Lives in st.session_state; its finalizer releases the session's result."""
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+
+
+class ResultManager:
+    """
+    Process-wide owner of the last result of every session.
+
+    In-memory results are accounted by deep byte size against `budget_bytes`.
+    Going over budget spills the least recently viewed results to Parquet in
+    `spill_dir`; they are reloaded on the next view. Results are released
+    when the session ends, or after `idle_seconds` without a view.
+    Parquet reads and writes happen outside the lock, so one large spill
+    doesn't stall every other session; `_used` counts "memory" entries only.
+    """
+
+    def __init__(self, budget_bytes: int, spill_dir: str, idle_seconds: float):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir
+        self.idle_seconds = idle_seconds
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()   # LRU by last view
+        self._used = 0
+        self.spills = 0
+        self.reloads = 0
+
+    # ---- session lifecycle ----
+
+    def attach(self, session_state, session_id: str):
+        """Tie the session's result to its Streamlit session state lifetime."""
+        if "_result_handle" not in session_state:
+            handle = _SessionHandle(session_id)
+            weakref.finalize(handle, self.release, session_id)
+            session_state["_result_handle"] = handle
+
+    def release(self, session_id: str):
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is None:
+                return
+            if entry.state == "memory":
+                self._used -= entry.nbytes
+        _remove(entry.path)
+
+    def sweep_idle(self):
+        cutoff = time.time() - self.idle_seconds
+        with self._lock:
+            idle = [sid for sid, e in self._entries.items() if e.viewed < cutoff]
+        for sid in idle:
+            self.release(sid)
+
+    # ---- results ----
+
+    def put(self, session_id: str, pdf, **meta):
+        self.release(session_id)
+        nbytes = int(pdf.memory_usage(deep=True).sum())
+        with self._lock:
+            self._entries[session_id] = _Entry(pdf, nbytes, meta)
+            self._used += nbytes
+            victims = self._pick_spills(keep=session_id)
+        self._spill(victims)
+        self.sweep_idle()
+
+    def get(self, session_id: str):
+        """(pdf, meta) for the session's last result, or None."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            entry.viewed = time.time()
+            self._entries.move_to_end(session_id)
+            if entry.state == "spilling":
+                # viewed again before the write finished: keep it in memory
+                entry.state = "memory"
+                self._used += entry.nbytes
+            if entry.state == "memory":
+                return entry.pdf, entry.meta
+            loader = entry.state == "spilled"
+            if loader:
+                entry.state, entry.loaded = "loading", threading.Event()
+            loaded = entry.loaded
+
+        if not loader:
+            loaded.wait()
+            return (entry.pdf, entry.meta) if entry.pdf is not None else None
+
+        try:
+            with open(entry.path, "rb") as f:
+                pdf = loads_df(f.read())
+        except (OSError, ValueError):
+            pdf = None   # spill file gone or unreadable: the user can re-run
+        victims = []
+        with self._lock:
+            current = self._entries.get(session_id) is entry
+            entry.pdf, entry.state = pdf, "memory"
+            if current and pdf is None:
+                del self._entries[session_id]
+            elif current:
+                self._used += entry.nbytes
+                self.reloads += 1
+                victims = self._pick_spills(keep=session_id)
+            loaded.set()
+        self._spill(victims)
+        return (pdf, entry.meta) if pdf is not None else None
+
+    def _pick_spills(self, keep: str) -> list:
+        """Under the lock: mark LRU results to spill until under budget
+        (never the one being viewed). The caller writes them via _spill."""
+        victims = []
+        for sid, entry in self._entries.items():
+            if self._used <= self.budget_bytes:
+                break
+            if sid == keep or entry.state != "memory":
+                continue
+            entry.state = "spilling"
+            self._used -= entry.nbytes
+            victims.append((sid, entry))
+        return victims
+
+    def _spill(self, victims: list):
+        """Write marked results to Parquet (outside the lock), then drop them from memory."""
+        for session_id, entry in victims:
+            path, wrote = entry.path, False
+            if path is None:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                path = os.path.join(self.spill_dir, f"{session_id}.{uuid.uuid4().hex[:12]}.parquet")
+                try:
+                    blob = dumps_df(entry.pdf)
+                    with open(path, "wb") as f:
+                        f.write(blob)
+                    wrote = True
+                except (OSError, ValueError, TypeError, NotImplementedError):
+                    # can't be written: drop it unless it was viewed meanwhile
+                    _remove(path)
+                    with self._lock:
+                        if self._entries.get(session_id) is entry and entry.state == "spilling":
+                            del self._entries[session_id]
+                    continue
+            with self._lock:
+                current = self._entries.get(session_id) is entry
+                if current:
+                    entry.path = path
+                    if entry.state == "spilling":
+                        entry.pdf, entry.state = None, "spilled"
+                        self.spills += 1
+            if wrote and not current:
+                _remove(path)   # released while we were writing
+
+    def usage(self) -> dict:
+        with self._lock:
+            entries = list(self._entries.items())
+            used = self._used
+        return {
+            "budget_bytes": self.budget_bytes,
+            "in_memory_bytes": used,
+            "sessions": len(entries),
+            "in_memory": sum(1 for _, e in entries if e.pdf is not None),
+            "spilled": sum(1 for _, e in entries if e.pdf is None),
+            "spills": self.spills,
+            "reloads": self.reloads,
+            "entries": [
+                {
+                    "session": sid[:8],
+                    "bytes": e.nbytes,
+                    "state": e.state,
+                    "idle_s": round(time.time() - e.viewed),
+                    "provider": e.meta.get("provider_used", ""),
+                }
+                for sid, e in entries
+            ],
+        }
+
+
+def _remove(path: str | None):
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+RESULTS = ResultManager(
+    budget_bytes=RESULT_MEMORY_BUDGET_MB * 1024 * 1024,
+    spill_dir=RESULT_SPILL_DIR,
+    idle_seconds=RESULT_IDLE_SECONDS,
+)
@@ -0,0 +1,134 @@
+import re
+from config.settings import FQTN, PREVIEW_SAMPLE_PERCENT, PREVIEW_SAMPLE_METHOD
+
+_AGG_RE = re.compile(r"\b(?:SUM|COUNT)\s*\(", re.IGNORECASE)
+_ADDITIVE_CALL_RE = re.compile(r"\s*(SUM|COUNT)\s*\((.*)\)\s*", re.IGNORECASE | re.DOTALL)
+_WRAPPER_RE = re.compile(r"\s*(ROUND|CAST|TRY_CAST)\s*\((.*)\)\s*", re.IGNORECASE | re.DOTALL)
+# "expr AS alias", "expr alias", "expr AS `alias`"
+_ALIAS_RE = re.compile(r"(.*?[\w)`'\"])\s+(?:AS\s+)?(`[^`]+`|[A-Za-z_]\w*)\s*", re.IGNORECASE | re.DOTALL)
+_NOT_ALIASES = {"end", "as", "distinct", "and", "or", "not", "null", "else", "then"}
+
+
+def _mask(text: str) -> str:
+    """
+    Same-length copy of `text` with string/identifier quotes and everything
+    inside parentheses blanked, so regexes only see the top level.
+    """
+    out, depth, quote = [], 0, None
+    for ch in text:
+        if quote:
+            out.append(ch if ch == quote else " ")
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+            out.append(ch)
+        elif ch == "(":
+            out.append(ch if depth == 0 else " ")
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            out.append(ch if depth == 0 else " ")
+        else:
+            out.append(ch if depth == 0 else " ")
+    return "".join(out)
+
+
+def _split_top(text: str) -> list[str]:
+    """Split on top-level commas."""
+    parts, start = [], 0
+    for i, ch in enumerate(_mask(text)):
+        if ch == ",":
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _kind(expr: str) -> str:
+    """How an output column behaves on a sample: "additive" (scale up by
+    1/fraction), "distinct" (COUNT(DISTINCT ...), can't be scaled), "ratio"
+    or "plain" (unbiased as is), or "unknown"."""
+    while True:
+        m = _WRAPPER_RE.fullmatch(expr)
+        if not (m and _mask(expr).strip().endswith(")") and _mask(expr).count("(") == 1):
+            break
+        inner = m.group(2)
+        if m.group(1).upper() == "ROUND":
+            expr = _split_top(inner)[0]
+        else:
+            expr = re.split(r"\s+AS\s+", _mask(inner), flags=re.IGNORECASE)[0]
+            expr = inner[:len(expr)]
+    m = _ADDITIVE_CALL_RE.fullmatch(expr)
+    if m and _mask(expr).count("(") == 1:
+        return "distinct" if m.group(2).lstrip().upper().startswith("DISTINCT") else "additive"
+    if not _AGG_RE.search(expr):
+        return "plain"
+    if "/" in _mask(expr):
+        return "ratio"
+    return "unknown"
+
+
+def _from_table_re(fqtn: str):
+    return re.compile(rf"\bFROM\s+{re.escape(fqtn)}\b", re.IGNORECASE)
+
+
+def sample_sql(sql_text: str, percent: float = PREVIEW_SAMPLE_PERCENT,
+               method: str = PREVIEW_SAMPLE_METHOD, fqtn: str = FQTN) -> str | None:
+    """
+    Rewrite a validated SELECT to read a `percent` sample of the table, or
+    None when the table isn't referenced exactly once (joins, CTEs reusing it).
+    """
+    pat = _from_table_re(fqtn)
+    if len(re.findall(re.escape(fqtn), sql_text, re.IGNORECASE)) != 1 or not pat.search(sql_text):
+        return None
+    if method == "rand":
+        sampled = f"FROM (SELECT * FROM {fqtn} WHERE rand() < {percent / 100}) AS _sample"
+    else:
+        sampled = f"FROM {fqtn} TABLESAMPLE ({percent} PERCENT)"
+    return pat.sub(lambda m: sampled, sql_text, count=1)
+
+
+def additive_columns(sql_text: str, fqtn: str = FQTN) -> list[str] | None:
+    """
+    Output columns of a single-level SELECT over `fqtn` whose sample value
+    scales with 1/fraction ("SUM(sales) AS sales", "COUNT(*) n",
+    "ROUND(SUM(x), 2) AS `x`"). Ratios, AVG/MIN/MAX and COUNT(DISTINCT ...)
+    are left as they are. None when a sample can't be scaled faithfully:
+    CTEs/subqueries over the table, HAVING, or a SUM/COUNT whose output
+    column can't be named or whose shape isn't understood.
+    """
+    masked = _mask(sql_text)
+    select = re.match(r"\s*SELECT\s+(?:DISTINCT\s+)?", masked, re.IGNORECASE)
+    from_ = re.search(r"\bFROM\b", masked, re.IGNORECASE)
+    if not (select and from_) or not _from_table_re(fqtn).match(sql_text, from_.start()):
+        return None
+    if re.search(r"\bHAVING\b", masked, re.IGNORECASE):
+        return None
+
+    additive = []
+    for item in _split_top(sql_text[select.end():from_.start()]):
+        m = _ALIAS_RE.fullmatch(_mask(item))
+        alias = item[m.start(2):m.end(2)].strip("`") if m else None
+        if alias and alias.lower() in _NOT_ALIASES:
+            alias = None
+        expr = item[:m.end(1)] if alias else item
+        kind = _kind(expr)
+        if kind == "unknown" or (kind != "plain" and not alias):
+            return None
+        if kind == "additive":
+            additive.append(alias)
+    return additive
+
+
+def scale_estimate(pdf, sql_text: str, percent: float = PREVIEW_SAMPLE_PERCENT):
+    """Scale SUM/COUNT columns of a sampled result up to full-table estimates."""
+    factor = 100.0 / percent
+    est = pdf.copy()
+    by_name = {str(c).lower(): c for c in est.columns}
+    for alias in additive_columns(sql_text) or ():
+        col = by_name.get(alias.lower())
+        if col is not None:
+            est[col] = est[col].astype("float64") * factor
+    est.attrs = dict(pdf.attrs, approximate=True)
+    return est
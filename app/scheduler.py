@@ -0,0 +1,170 @@
+import itertools, threading, time
+from contextlib import contextmanager
+from config.settings import WAREHOUSE_MAX_CONCURRENCY, QUERY_PRIORITY_AGING_SECONDS
+
+PRIORITY_CHEAP = 0   # rules-generated aggregates / time series
+PRIORITY_ADHOC = 1   # manual SQL and Genie-written SQL
+
+
+class Cancelled(Exception):
+    """The ticket was cancelled before its query got to run."""
+
+
+class Ticket:
+    """One query's place in line. `state` is new -> waiting -> running -> done."""
+
+    def __init__(self, user: str, priority: int):
+        self.user = user
+        self.priority = priority
+        self.state = "new"
+        self.cancelled = False
+        self.seq = 0
+        self.enqueued = None
+        self.started = None
+
+    @property
+    def waited(self) -> float:
+        if self.enqueued is None:
+            return 0.0
+        return (time.monotonic() if self.started is None else self.started) - self.enqueued
+
+
+class QueryScheduler:
+    """
+    Admission control in front of the warehouse.
+
+    At most `max_concurrency` queries run at once. When a slot frees up the
+    next waiting ticket is chosen by:
+      1. priority class (cheap first), aged by one class per `aging` seconds
+         waited so ad-hoc queries can't starve,
+      2. fewest queries already running for that user,
+      3. the user served least recently,
+      4. arrival order.
+    `clock` is the monotonic time source (injectable for tests).
+    """
+
+    def __init__(self, max_concurrency: int, aging: float, clock=time.monotonic):
+        self.max_concurrency = max_concurrency
+        self.aging = aging
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._waiting: list[Ticket] = []
+        self._running: dict[str, int] = {}
+        self._last_served: dict[str, int] = {}
+        self._seq = itertools.count(1)
+        self._served = itertools.count(1)
+        # metrics
+        self.admitted = 0
+        self.cancelled = 0
+        self.max_depth = 0
+        self.wait_seconds = {PRIORITY_CHEAP: 0.0, PRIORITY_ADHOC: 0.0}
+        self.wait_count = {PRIORITY_CHEAP: 0, PRIORITY_ADHOC: 0}
+
+    def _key(self, t: Ticket, now: float):
+        effective = max(0, t.priority - int((now - t.enqueued) // self.aging)) if self.aging else t.priority
+        return (effective, self._running.get(t.user, 0), self._last_served.get(t.user, 0), t.seq)
+
+    def _ordered(self) -> list[Ticket]:
+        now = self.clock()
+        return sorted(self._waiting, key=lambda t: self._key(t, now))
+
+    def acquire(self, ticket: Ticket):
+        """Wait for a slot; raises Cancelled if `ticket` is cancelled first."""
+        with self._cond:
+            if ticket.cancelled:
+                ticket.state = "done"
+                raise Cancelled()
+            ticket.seq = next(self._seq)
+            ticket.enqueued = self.clock()
+            ticket.state = "waiting"
+            self._waiting.append(ticket)
+            self.max_depth = max(self.max_depth, len(self._waiting))
+            try:
+                while not (ticket.cancelled
+                           or sum(self._running.values()) < self.max_concurrency
+                           and self._ordered()[0] is ticket):
+                    # timeout so aging re-orders the queue even without releases
+                    self._cond.wait(timeout=1.0)
+                if ticket.cancelled:
+                    raise Cancelled()
+            except BaseException:
+                # interrupted or cancelled while waiting: don't hold up the line
+                ticket.state = "done"
+                self._cond.notify_all()
+                raise
+            finally:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+            self._running[ticket.user] = self._running.get(ticket.user, 0) + 1
+            self._last_served[ticket.user] = next(self._served)
+            ticket.started = self.clock()
+            ticket.state = "running"
+            self.admitted += 1
+            self.wait_seconds[ticket.priority] = self.wait_seconds.get(ticket.priority, 0.0) + ticket.waited
+            self.wait_count[ticket.priority] = self.wait_count.get(ticket.priority, 0) + 1
+            self._cond.notify_all()
+
+    def release(self, ticket: Ticket):
+        with self._cond:
+            self._running[ticket.user] -= 1
+            if not self._running[ticket.user]:
+                del self._running[ticket.user]
+            ticket.state = "done"
+            self._cond.notify_all()
+
+    def cancel(self, ticket: Ticket):
+        """
+        Withdraw a ticket whose result is no longer wanted. A waiting ticket
+        leaves the queue and its acquire() raises Cancelled; one not queued
+        yet never will be; one already admitted skips its slot() body if it
+        hasn't started. A query already running is left to finish.
+        """
+        with self._cond:
+            if ticket.cancelled or ticket.state == "done":
+                return
+            ticket.cancelled = True
+            if ticket.state == "running":
+                return
+            self.cancelled += 1
+            if ticket.state == "waiting":
+                self._waiting.remove(ticket)
+                ticket.state = "done"
+                self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, ticket: Ticket):
+        self.acquire(ticket)
+        try:
+            if ticket.cancelled:
+                raise Cancelled()
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based place in line while waiting, else 0."""
+        with self._cond:
+            if ticket.state != "waiting":
+                return 0
+            return self._ordered().index(ticket) + 1
+
+    def metrics(self) -> dict:
+        with self._cond:
+            waiting = list(self._waiting)
+            running = sum(self._running.values())
+            return {
+                "max_concurrency": self.max_concurrency,
+                "running": running,
+                "queue_depth": len(waiting),
+                "queue_depth_cheap": sum(1 for t in waiting if t.priority == PRIORITY_CHEAP),
+                "queue_depth_adhoc": sum(1 for t in waiting if t.priority == PRIORITY_ADHOC),
+                "max_queue_depth": self.max_depth,
+                "admitted": self.admitted,
+                "cancelled": self.cancelled,
+                "avg_wait_s_cheap": self.wait_seconds[PRIORITY_CHEAP] / max(self.wait_count[PRIORITY_CHEAP], 1),
+                "avg_wait_s_adhoc": self.wait_seconds[PRIORITY_ADHOC] / max(self.wait_count[PRIORITY_ADHOC], 1),
+                "users_running": len(self._running),
+            }
+
+
+SCHEDULER = QueryScheduler(WAREHOUSE_MAX_CONCURRENCY, QUERY_PRIORITY_AGING_SECONDS)
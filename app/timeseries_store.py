@@ -0,0 +1,61 @@
+import hashlib
+from config.settings import TIMESERIES_CACHE_TTL
+from app.cache import get_cache, dumps_df, loads_df_meta
+from app.data_bounds import get_date_bounds
+from app.db import fetch_df
+
+
+def _merge(cached, delta, col: str, since):
+    import pandas as pd
+
+    bound = pd.Timestamp(since)
+    if cached[col].dt.tz is not None:
+        bound = bound.tz_localize(cached[col].dt.tz)
+    keep = cached[cached[col] < bound]
+    merged = pd.concat([keep, delta], ignore_index=True)
+    return merged.sort_values(col, ignore_index=True)
+
+
+def get_series(spec, fetch=fetch_df):
+    """
+    Result of a rules TimeSeriesSpec, refreshed incrementally.
+
+    The first call runs the full query. Later calls return the cached series
+    while max(order_date) is unchanged; once it moves, only periods at or
+    after the last cached period boundary are re-aggregated and merged in.
+    Assumes new rows only land in the latest period(s), as with a daily load.
+    A "last N months" series is keyed without its window, which moves with
+    max(order_date): it stays one entry and is re-run whole when data lands.
+    Series live in the shared cache backend, so replicas refresh each other's.
+    """
+    import pandas as pd
+
+    _, data_max = get_date_bounds()
+    if spec.last_n_months:
+        spec = spec._replace(data_max=data_max)
+    col = spec.grain
+    key = "ts:" + hashlib.sha1(repr(spec.stable()).encode()).hexdigest()
+    cache = get_cache()
+
+    blob = cache.get(key)
+    cached, cached_max = (None, None)
+    if blob is not None:
+        try:
+            cached, meta = loads_df_meta(blob)
+        except ValueError:
+            cached, meta = None, None   # written in an older format: rebuild
+        cached_max = (meta or {}).get("data_max")
+        if cached is not None and cached_max == data_max:
+            return cached
+
+    if cached is None or cached.empty or spec.last_n_months:
+        df = fetch(spec.sql())
+        df[col] = pd.to_datetime(df[col])
+    else:
+        since = cached[col].max().date()
+        delta = fetch(spec.sql(since=since))
+        delta[col] = pd.to_datetime(delta[col])
+        df = _merge(cached, delta, col, since)
+
+    cache.set(key, dumps_df(df, meta={"data_max": data_max}), ttl=TIMESERIES_CACHE_TTL)
+    return df
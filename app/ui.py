@@ -1,5 +1,10 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
 import streamlit as st
-import pandas as pd
+from config.registry import REGISTRY
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 def render_form(default_example: str):
     with st.form("genie_form"):
@@ -7,8 +12,30 @@ def render_form(default_example: str):
             "Ask in plain English (or paste a SELECT):",
             value=default_example, height=90
         )
+        preview = st.checkbox(
+            "Fast preview", value=False,
+            help="Show an estimate from a sample first, then the exact result."
+        )
         submitted = st.form_submit_button("Run")
-    return user_q, submitted
+    return user_q, submitted, preview
+
+def wait_with_queue_status(fut, ticket, scheduler, until=None, label: str = ""):
+    """
+    Block on `fut`, showing the ticket's queue position and wait meanwhile.
+    With `until` (another future), stop early and return None once it is done.
+    """
+    from concurrent.futures import wait, FIRST_COMPLETED
+
+    status = st.empty()
+    futures = [fut] if until is None else [fut, until]
+    while not wait(futures, timeout=0.25, return_when=FIRST_COMPLETED).done:
+        if ticket.state == "waiting":
+            status.info(f"{label}Queued for the warehouse: position {scheduler.position(ticket)}, "
+                        f"waiting {ticket.waited:.0f}s")
+        elif ticket.state == "running":
+            status.caption(f"{label}Running on the warehouse...")
+    status.empty()
+    return fut.result() if fut.done() else None
 
 def render_results(pdf: pd.DataFrame):
     st.subheader("Results")
@@ -16,7 +43,9 @@ def render_results(pdf: pd.DataFrame):
 
 def render_quick_chart(pdf: pd.DataFrame, debug: bool = False):
     try:
+        # deferred: pandas/altair load on the first chart, not at app start
         import altair as alt
+        import pandas as pd
         if pdf is None or pdf.empty:
             return
 
@@ -29,13 +58,19 @@ def render_quick_chart(pdf: pd.DataFrame, debug: bool = False):
             st.write("DEBUG columns:", list(df.columns))
             st.dataframe(df.head())  # show first few rows
 
-        # Force numeric coercion where possible
-        for c in df.columns:
-            if df[c].dtype == "object":
-                df[c] = pd.to_numeric(df[c], errors="ignore")
+        # Force numeric coercion where possible (already done for fetched results)
+        if not pdf.attrs.get("normalized"):
+            for c in df.columns:
+                # pandas 3 reads text as the "str" dtype, not object
+                if df[c].dtype == "object" or pd.api.types.is_string_dtype(df[c]):
+                    try:
+                        df[c] = pd.to_numeric(df[c])
+                    except (ValueError, TypeError):
+                        pass
 
         num_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
-        cat_cols = [c for c in df.columns if df[c].dtype == "object" or df[c].dtype.name == "category"]
+        cat_cols = [c for c in df.columns
+                    if df[c].dtype.name == "category" or pd.api.types.is_string_dtype(df[c])]
 
         # --- 1. Detect time-like column (relaxed) ---
         ts_candidates = [c for c in df.columns if any(tok in c for tok in ["year","quarter","month","date"])]
@@ -58,8 +93,7 @@ def render_quick_chart(pdf: pd.DataFrame, debug: bool = False):
                 df[ts_col] = df[ts_col].map(month_map)
                 month_order = list(month_map.values())
 
-            preferred = ("sales","profit","quantity","discount","profit_margin")
-            metrics = [c for c in num_cols if c in preferred] or num_cols
+            metrics = [c for c in num_cols if c in REGISTRY.preferred_chart_metrics] or num_cols
 
             n_periods = df[ts_col].nunique(dropna=True)
             use_grouped_bars = ("quarter" in ts_col) and (len(metrics) >= 2) and (n_periods <= 4)
@@ -67,7 +101,7 @@ def render_quick_chart(pdf: pd.DataFrame, debug: bool = False):
             st.subheader("Quick chart")
 
             if use_grouped_bars:
-                bar_metrics = [m for m in metrics if m != "profit_margin"] or metrics
+                bar_metrics = [m for m in metrics if m not in REGISTRY.non_bar_metrics] or metrics
                 long_df = df[[ts_col] + bar_metrics].melt(id_vars=[ts_col],
                     value_vars=bar_metrics, var_name="metric", value_name="value")
                 st.altair_chart(
@@ -116,9 +150,8 @@ def render_quick_chart(pdf: pd.DataFrame, debug: bool = False):
         # --- 2. Categorical bar charts ---
         if cat_cols and num_cols:
             # prefer most specific categorical column
-            priority = ["sub_category","customer_name","region","segment","category"]
-            x = next((c for c in priority if c in cat_cols), cat_cols[0])
-            ycols = [c for c in num_cols if c not in ("profit_margin",)]
+            x = next((c for c in REGISTRY.chart_dim_priority if c in cat_cols), cat_cols[0])
+            ycols = [c for c in num_cols if c not in REGISTRY.non_bar_metrics]
             st.subheader("Quick chart")
             if len(ycols) == 1:
                 y = ycols[0]
@@ -9,14 +9,18 @@ _BANNED_VERBS = re.compile(
     r")\b",
     flags=re.IGNORECASE,
 )
+# 'it''s', 'O\'Donnell' -> '' so values like 'Grant Thornton' or 'Flash Drive; 16GB'
+# aren't read as verbs or statement separators
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
 
 def is_safe_select(sql_text: str) -> bool:
     s = " ".join(sql_text.strip().lower().split())
-    if ";" in s or "--" in s or "/*" in s or "*/" in s:
+    code = _STRING_LITERAL.sub("''", s)
+    if ";" in code or "--" in code or "/*" in code or "*/" in code:
         return False
     if not (s.startswith("select") or s.startswith("with")):
         return False
-    if _BANNED_VERBS.search(s):
+    if _BANNED_VERBS.search(code):
         return False
     if s.startswith("with") and " select " not in f" {s} ":
         return False
@@ -24,4 +28,4 @@ def is_safe_select(sql_text: str) -> bool:
 
 def expand_table(sql_text: str) -> str:
     """Allow ad-hoc SQL to use {FQTN} like our f-strings do."""
-    return sql_text.replace("{FQTN}", FQTN)
\ No newline at end of file
+    return sql_text.replace("{FQTN}", FQTN)
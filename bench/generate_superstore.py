@@ -0,0 +1,92 @@
+"""
+Synthetic Superstore generator: any number of rows, same schema and
+distributions as data/Superstore.xlsx, written as Parquet in chunks.
+
+Rows are bootstrap-resampled from the real extract, so joint distributions
+(region/state/city, category/subcategory/product, segment/customer) stay
+intact. Each sampled row then gets a jittered order date within the original
+date range (ship lag preserved) and lognormal noise on sales/profit, so
+values don't repeat exactly. Columns use the warehouse names from the
+semantic layer (order_date, subcategory, ship_mode, ...).
+
+    PYTHONPATH=. python bench/generate_superstore.py --rows 10000000 --out /tmp/superstore_10M.parquet
+"""
+import argparse, re
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config.registry import REGISTRY
+from config.settings import SUPERSTORE_PATH
+from app.dimension_values import _col_key   # the app's own header -> column matching
+
+
+def load_source(path: str = SUPERSTORE_PATH) -> pd.DataFrame:
+    """The real extract with warehouse column names."""
+    src = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_excel(path)
+    registry_cols = {_col_key(c): c for c in REGISTRY.dim_column.values()}
+    rename = {}
+    for c in src.columns:
+        snake = re.sub(r"[^a-z0-9]+", "_", c.lower()).strip("_")
+        rename[c] = registry_cols.get(_col_key(c), snake)
+    src = src.rename(columns=rename).drop(columns=["row_id"], errors="ignore")
+    src["order_date"] = pd.to_datetime(src["order_date"])
+    src["ship_date"] = pd.to_datetime(src["ship_date"])
+    return src
+
+
+def generate_chunk(src: pd.DataFrame, n: int, rng: np.random.Generator, start_id: int) -> pd.DataFrame:
+    idx = rng.integers(0, len(src), size=n)
+    out = src.iloc[idx].reset_index(drop=True)
+
+    lo, hi = src["order_date"].min(), src["order_date"].max()
+    lag = out["ship_date"] - out["order_date"]
+    jitter = pd.to_timedelta(rng.integers(-15, 16, size=n), unit="D")
+    order_date = (out["order_date"] + jitter).clip(lo, hi)
+    out["order_date"] = order_date
+    out["ship_date"] = order_date + lag
+
+    noise = rng.lognormal(mean=0.0, sigma=0.1, size=n)
+    out["sales"] = (out["sales"] * noise).round(2)
+    out["profit"] = (out["profit"] * noise).round(4)
+
+    ids = pd.Series(np.arange(start_id, start_id + n)).astype(str).str.zfill(9)
+    out["order_id"] = "SY-" + order_date.dt.year.astype(str) + "-" + ids
+    return out
+
+
+def generate(rows: int, out_path: str, seed: int = 0, chunk_rows: int = 1_000_000,
+             source: str = SUPERSTORE_PATH) -> str:
+    src = load_source(source)
+    rng = np.random.default_rng(seed)
+    writer = None
+    try:
+        done = 0
+        while done < rows:
+            n = min(chunk_rows, rows - done)
+            table = pa.Table.from_pandas(generate_chunk(src, n, rng, done), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, table.schema, compression="zstd")
+            writer.write_table(table)
+            done += n
+    finally:
+        if writer is not None:
+            writer.close()
+    return out_path
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, required=True)
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--chunk-rows", type=int, default=1_000_000)
+    ap.add_argument("--source", default=SUPERSTORE_PATH)
+    args = ap.parse_args()
+    generate(args.rows, args.out, args.seed, args.chunk_rows, args.source)
+    print(f"wrote {args.rows:,} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Scaling benchmark for the app's pipeline stages on a local backend.
+
+For each size, a synthetic Superstore table (bench/generate_superstore.py)
+is queried through DuckDB standing in for the SQL warehouse, and each stage
+the app runs is timed:
+
+    fetch          full-table SELECT *: execute + fetchall (connector-style rows)
+    dataframe      rows -> DataFrame + normalize_result (app.db.rows_to_df)
+    rules_sql      every rules-answerable question in config/dashboard.json, run to rows
+    chart_agg      render_quick_chart on a rules aggregate (sales by month)
+    chart_rows     render_quick_chart on order-level rows (order_date, sales);
+                   skipped above altair's default 5,000-row limit, where the
+                   app renders no chart at all
+    csv_export     render_download's to_csv(...).encode() on the full frame
+
+Each stage records wall time, throughput (table rows / s), its peak resident
+memory above the level it started at (sampled from /proc every 5 ms, so
+DuckDB's native heap counts too; Linux only) and the process RSS high-water
+mark. altair is warmed up before the first size, so chart timings exclude
+its import. Streamlit calls run in bare mode; its warnings go to stderr, the
+table to stdout.
+
+Needs the bench extras: pip install -r bench/requirements.txt
+
+    PYTHONPATH=. python bench/run_benchmarks.py --sizes 10000,100000,1000000,10000000
+"""
+import argparse, json, os, resource, sys, threading, time
+
+import duckdb
+
+from config.settings import DASHBOARD_PATH
+from app.db import rows_to_df
+from app.ui import render_quick_chart
+from providers import router
+from bench.generate_superstore import generate
+
+TABLE = "superstore"
+# altair's default data transformer refuses bigger inline datasets
+ALTAIR_MAX_ROWS = 5000
+
+# Spark SQL functions the rules provider emits that DuckDB spells differently
+_MACROS = [
+    "CREATE OR REPLACE MACRO add_months(d, n) AS CAST(d AS DATE) + to_months(CAST(n AS INTEGER))",
+]
+
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_hwm_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _rss_now() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE
+    except OSError:
+        return None
+
+
+class Stage:
+    """Time one stage and sample its peak RSS in a background thread."""
+
+    def __init__(self, name: str, rows: int, results: list):
+        self.name, self.rows, self.results = name, rows, results
+
+    def _sample(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, _rss_now() or 0)
+
+    def __enter__(self):
+        self.base = self.peak = _rss_now() or 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.t0
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_now() or 0)
+        if exc[0] is None:
+            self.results.append({
+                "rows": self.rows,
+                "stage": self.name,
+                "seconds": round(seconds, 4),
+                "rows_per_s": round(self.rows / seconds) if seconds else None,
+                "peak_mb": round((self.peak - self.base) / (1024 * 1024), 1) if self.base else None,
+                "rss_hwm_mb": round(_rss_hwm_mb(), 1),
+            })
+        return False
+
+
+def _connect(parquet_path: str):
+    con = duckdb.connect()
+    con.execute(f"CREATE VIEW {TABLE} AS SELECT * FROM read_parquet('{parquet_path}')")
+    for macro in _MACROS:
+        con.execute(macro)
+    return con
+
+
+def _rules_queries(con) -> list[str]:
+    lo, hi = con.execute(f"SELECT min(order_date)::DATE, max(order_date)::DATE FROM {TABLE}").fetchone()
+    with open(DASHBOARD_PATH, encoding="utf-8") as f:
+        questions = json.load(f)
+    queries = []
+    for q in questions:
+        sql_text = router.rules_tier(q, TABLE, lo, hi)
+        if sql_text:
+            queries.append(sql_text)
+    return queries
+
+
+def run_size(rows: int, data_dir: str, seed: int) -> list[dict]:
+    path = os.path.join(data_dir, f"superstore_{rows}.parquet")
+    if not os.path.exists(path):
+        generate(rows, path, seed=seed)
+
+    con = _connect(path)
+    results: list[dict] = []
+
+    with Stage("fetch", rows, results):
+        cur = con.execute(f"SELECT * FROM {TABLE}")
+        raw = cur.fetchall()
+        description = cur.description
+
+    with Stage("dataframe", rows, results):
+        pdf = rows_to_df(raw, description)
+    del raw
+
+    queries = _rules_queries(con)
+    with Stage("rules_sql", rows, results):
+        for sql_text in queries:
+            con.execute(sql_text).fetchall()
+
+    monthly = con.execute(router.rules_tier("sales by month", TABLE, None, None))
+    monthly = rows_to_df(monthly.fetchall(), monthly.description)
+    with Stage("chart_agg", rows, results):
+        render_quick_chart(monthly)
+
+    if rows <= ALTAIR_MAX_ROWS:
+        with Stage("chart_rows", rows, results):
+            render_quick_chart(pdf[["order_date", "sales"]])
+    else:
+        results.append({"rows": rows, "stage": "chart_rows",
+                        "skipped": f"over altair's {ALTAIR_MAX_ROWS:,}-row limit; the app shows no chart"})
+
+    with Stage("csv_export", rows, results):
+        pdf.to_csv(index=False).encode("utf-8")
+
+    con.close()
+    return results
+
+
+def _warm_up():
+    """Pay the pandas/altair imports and first-chart setup outside any stage."""
+    import pandas as pd
+
+    render_quick_chart(pd.DataFrame({"region": ["West", "East"], "sales": [1.0, 2.0]}))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", default="10000,100000,1000000",
+                    help="comma-separated row counts")
+    ap.add_argument("--data-dir", default="/tmp/superstore-bench")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="append results as JSON lines to this file")
+    args = ap.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    _warm_up()
+
+    print(f"{'rows':>12} {'stage':<12} {'seconds':>9} {'rows/s':>14} {'peak MB':>9} {'rss hwm MB':>11}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        for r in run_size(size, args.data_dir, args.seed):
+            if "skipped" in r:
+                print(f"{r['rows']:>12,} {r['stage']:<12} skipped: {r['skipped']}")
+            else:
+                print(f"{r['rows']:>12,} {r['stage']:<12} {r['seconds']:>9.3f} "
+                      f"{r['rows_per_s'] or 0:>14,} {r['peak_mb'] or 0:>9.1f} {r['rss_hwm_mb']:>11.1f}")
+            if args.out:
+                with open(args.out, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(r) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import json, os, re, threading
+
+SEMANTIC_LAYER_PATH = os.getenv(
+    "SEMANTIC_LAYER_PATH",
+    os.path.join(os.path.dirname(__file__), "semantic_layer.json"),
+)
+
+
+def _value_key(value: str) -> str:
+    """Case/space-insensitive key, so 'home office' and 'HomeOffice' collide."""
+    return re.sub(r"[\s_]+", "", value.strip().lower())
+
+
+def _value_pattern(value: str) -> str:
+    words = value.strip().lower().split()
+    return r"[ _]?".join(re.escape(w) for w in words)
+
+
+class Registry:
+    """
+    Compiled view of the semantic layer (config/semantic_layer.json).
+    Everything here is built once at import; lookups are plain dicts.
+    """
+
+    def __init__(self, spec: dict):
+        self.metrics = spec["metrics"]
+        self.metric_sql = {name: m["sql"] for name, m in self.metrics.items()}
+        self.metric_order = {name: m.get("order", "DESC") for name, m in self.metrics.items()}
+        # alias -> metric; dict order is the match priority
+        self.metric_alias = {
+            alias: name for name, m in self.metrics.items() for alias in m["aliases"]
+        }
+        self.metric_alias_re = re.compile(
+            r"\b(" + "|".join(re.escape(a) for a in
+                               sorted(self.metric_alias, key=len, reverse=True)) + r")\b"
+        )
+
+        self.dimensions = spec["dimensions"]
+        self.dim_column = {name: d["column"] for name, d in self.dimensions.items()}
+        self.dim_patterns = [
+            (re.compile(pat), d["column"])
+            for d in self.dimensions.values() for pat in d["patterns"]
+        ]
+        self.value_dimensions = [n for n, d in self.dimensions.items() if d.get("load_values")]
+
+        chart = spec.get("chart", {})
+        self.preferred_chart_metrics = tuple(chart.get("preferred_metrics", ()))
+        self.chart_dim_priority = [self.dim_column[d] for d in chart.get("dimension_priority", ())]
+        self.non_bar_metrics = tuple(n for n, m in self.metrics.items() if not m.get("chart_bar", True))
+
+        self._lock = threading.Lock()
+        self.version = 0
+        self._values: dict[str, dict[str, str]] = {}
+        self._value_alt: dict[str, str] = {}
+        self.set_dimension_values(
+            {n: d["values"] for n, d in self.dimensions.items() if d.get("values")}
+        )
+
+    def agg_expr(self, metric: str) -> str:
+        if metric not in self.metric_sql:
+            metric = "sales"
+        parts = [f"{self.metric_sql[r]} AS {r}" for r in self.metrics[metric].get("requires", ())]
+        parts.append(f"{self.metric_sql[metric]} AS {metric}")
+        return ", ".join(parts)
+
+    def set_dimension_values(self, values: dict[str, list[str]]):
+        """Replace the known values for the given dimensions (e.g. from SELECT DISTINCT)."""
+        with self._lock:
+            for dim, vals in values.items():
+                vals = [str(v) for v in vals if v is not None and str(v).strip()]
+                if not vals:
+                    continue
+                self._values[dim] = {_value_key(v): v for v in vals}
+                pats = sorted({_value_pattern(v) for v in vals}, key=len, reverse=True)
+                self._value_alt[dim] = "(" + "|".join(pats) + ")"
+            self.version += 1
+
+    def dimension_values(self, dim: str) -> dict[str, str]:
+        """normalized key -> canonical warehouse value"""
+        return self._values.get(dim, {})
+
+    def all_dimension_values(self) -> dict[str, list[str]]:
+        return {dim: list(vals.values()) for dim, vals in self._values.items()}
+
+    def value_alternation(self, dim: str) -> str | None:
+        """Regex group matching any known value of `dim` (lower-cased text)."""
+        return self._value_alt.get(dim)
+
+    def canonical_value(self, dim: str, text: str) -> str | None:
+        return self._values.get(dim, {}).get(_value_key(text))
+
+
+def load_registry(path: str = SEMANTIC_LAYER_PATH) -> Registry:
+    with open(path, encoding="utf-8") as f:
+        return Registry(json.load(f))
+
+
+REGISTRY = load_registry()
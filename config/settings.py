@@ -4,3 +4,76 @@ CATALOG = os.getenv("CATALOG", "main")
 SCHEMA  = os.getenv("SCHEMA", "retail_gold")
 TABLE   = os.getenv("TABLE", "vw_sales_daily")
 FQTN    = f"{CATALOG}.{SCHEMA}.{TABLE}"
+
+# Seconds before dimension value lists (SELECT DISTINCT) are reloaded
+DIMENSION_VALUES_TTL = int(os.getenv("DIMENSION_VALUES_TTL", "3600"))
+
+# Where dimension values come from: "warehouse" (SELECT DISTINCT) or "local"
+DIMENSION_VALUES_SOURCE = os.getenv("DIMENSION_VALUES_SOURCE", "warehouse")
+SUPERSTORE_PATH = os.getenv(
+    "SUPERSTORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "Superstore.xlsx"),
+)
+
+# Seconds before min/max(order_date) is re-read; drives incremental time-series refresh
+DATE_BOUNDS_TTL = int(os.getenv("DATE_BOUNDS_TTL", "900"))
+# Seconds a cached time series is kept for delta refresh
+TIMESERIES_CACHE_TTL = int(os.getenv("TIMESERIES_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Max warehouse connections held open by this process (shared by all sessions)
+WAREHOUSE_POOL_SIZE = int(os.getenv("WAREHOUSE_POOL_SIZE", "8"))
+# Pooled connections idle longer than this are closed instead of reused
+# (the warehouse expires idle sessions)
+WAREHOUSE_CONN_IDLE_SECONDS = int(os.getenv("WAREHOUSE_CONN_IDLE_SECONDS", "600"))
+# Saved dashboard: JSON list of questions
+DASHBOARD_PATH = os.getenv(
+    "DASHBOARD_PATH",
+    os.path.join(os.path.dirname(__file__), "dashboard.json"),
+)
+
+# Cache backend shared by translations, results and metadata:
+# "memory" (per process) or "sqlite" (CACHE_PATH on a volume shared by replicas)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("CACHE_PATH", "/tmp/superstore-cache/cache.sqlite3")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+# Byte cap for the "memory" backend, which holds result blobs too
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# SQLite journal: the default rollback journal works on network volumes;
+# "WAL" is faster but only safe when every replica runs on the same host
+CACHE_SQLITE_JOURNAL_MODE = os.getenv("CACHE_SQLITE_JOURNAL_MODE", "DELETE")
+# Largest single entry the "sqlite" backend stores; bigger values are skipped
+CACHE_MAX_ENTRY_BYTES = int(os.getenv("CACHE_MAX_ENTRY_BYTES", str(32 * 1024 * 1024)))
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "300"))
+# Results above either limit (rows, or in-memory MB) are not encoded into the cache
+RESULT_CACHE_MAX_ROWS = int(os.getenv("RESULT_CACHE_MAX_ROWS", "200000"))
+RESULT_CACHE_MAX_MB = int(os.getenv("RESULT_CACHE_MAX_MB", "64"))
+TRANSLATION_CACHE_TTL = int(os.getenv("TRANSLATION_CACHE_TTL", "86400"))
+
+# Genie: idle conversations are recycled after this many seconds,
+# and at most GENIE_MAX_CONVERSATIONS are kept per process
+GENIE_CONVERSATION_TTL = int(os.getenv("GENIE_CONVERSATION_TTL", "900"))
+GENIE_MAX_CONVERSATIONS = int(os.getenv("GENIE_MAX_CONVERSATIONS", "256"))
+GENIE_POLL_INTERVAL = float(os.getenv("GENIE_POLL_INTERVAL", "3"))
+GENIE_POLL_ATTEMPTS = int(os.getenv("GENIE_POLL_ATTEMPTS", "3"))
+
+# String result columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = float(os.getenv("CATEGORY_MAX_UNIQUE_RATIO", "0.5"))
+
+# Process-wide budget for results kept for sessions; least recently viewed
+# results beyond it are spilled to Parquet under RESULT_SPILL_DIR
+RESULT_MEMORY_BUDGET_MB = int(os.getenv("RESULT_MEMORY_BUDGET_MB", "512"))
+RESULT_SPILL_DIR = os.getenv("RESULT_SPILL_DIR", "/tmp/superstore-results")
+RESULT_IDLE_SECONDS = int(os.getenv("RESULT_IDLE_SECONDS", "3600"))
+
+# Users (forwarded e-mail) allowed on the Admin page; empty disables the page
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
+# Warehouse admission control: queries running at once across all sessions,
+# and seconds of waiting that promote an ad-hoc query by one priority class
+WAREHOUSE_MAX_CONCURRENCY = int(os.getenv("WAREHOUSE_MAX_CONCURRENCY", str(WAREHOUSE_POOL_SIZE)))
+QUERY_PRIORITY_AGING_SECONDS = float(os.getenv("QUERY_PRIORITY_AGING_SECONDS", "15"))
+
+# "Fast preview": run the query over a sample first, then swap in the exact result.
+# Method "tablesample" uses TABLESAMPLE; "rand" filters rand() < p (works on views too)
+PREVIEW_SAMPLE_PERCENT = float(os.getenv("PREVIEW_SAMPLE_PERCENT", "1"))
+PREVIEW_SAMPLE_METHOD = os.getenv("PREVIEW_SAMPLE_METHOD", "tablesample")
@@ -1,56 +1,159 @@
-import os, time, requests
+import os, threading, time
+from collections import OrderedDict
+from config.settings import (
+    GENIE_CONVERSATION_TTL, GENIE_MAX_CONVERSATIONS, GENIE_POLL_INTERVAL, GENIE_POLL_ATTEMPTS,
+)
 
 class GenieError(RuntimeError):
     pass
 
 
-def translate(nl_query: str, fqtn: str, data_min, data_max) -> str:
-    host     = os.environ["DATABRICKS_HOST"]
+class ConversationRegistry:
+    """
+    Bounded session_id -> conversation_id map. Entries idle for longer than
+    `ttl` seconds are dropped on access; past `max_size` the least recently
+    used conversation is forgotten.
+    """
+
+    def __init__(self, ttl: float = GENIE_CONVERSATION_TTL, max_size: int = GENIE_MAX_CONVERSATIONS):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._convs: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+
+    def get(self, session_id: str) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._convs.get(session_id)
+            if hit is None:
+                return None
+            if now - hit[1] > self.ttl:
+                del self._convs[session_id]
+                return None
+            self._convs[session_id] = (hit[0], now)
+            self._convs.move_to_end(session_id)
+            return hit[0]
+
+    def peek(self, session_id: str) -> str | None:
+        """Like get(), but leaves the idle clock and LRU order alone."""
+        with self._lock:
+            hit = self._convs.get(session_id)
+        if hit is None or time.monotonic() - hit[1] > self.ttl:
+            return None
+        return hit[0]
+
+    def put(self, session_id: str, conv_id: str):
+        with self._lock:
+            self._convs[session_id] = (conv_id, time.monotonic())
+            self._convs.move_to_end(session_id)
+            while len(self._convs) > self.max_size:
+                self._convs.popitem(last=False)
+
+    def drop(self, session_id: str):
+        with self._lock:
+            self._convs.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._convs)
+
+
+CONVERSATIONS = ConversationRegistry()
+_local = threading.local()
+
+
+def _http():
+    """One keep-alive requests.Session per thread."""
+    import requests  # deferred: only Genie misses pay for it
+
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = _local.session = requests.Session()
+    return s
+
+
+def has_conversation(session_id: str | None) -> bool:
+    # routing checks must not keep a conversation alive: only asking Genie does
+    return bool(session_id) and CONVERSATIONS.peek(session_id) is not None
+
+
+def translate(nl_query: str, fqtn: str, data_min, data_max, session_id: str | None = None) -> str:
+    """
+    Ask Genie for SQL. With a `session_id`, follow-up questions are sent as
+    new messages in that session's live conversation (keeping its context
+    and skipping conversation setup); otherwise a new conversation starts.
+    """
+    host     = os.environ["DATABRICKS_HOST"].rstrip("/") + "/"
     token    = os.environ["DATABRICKS_TOKEN"]
     space_id = os.environ["GENIE_SPACE_ID"]
+    base     = f"{host}api/2.0/genie/spaces/{space_id}"
+    http     = _http()
 
-    # 1. Start a conversation
-    url = f"{host}api/2.0/genie/spaces/{space_id}/start-conversation"
-    payload = {
-        "content": nl_query,
-        "hints": {
-            "catalog": "main",
-            "schemas": ["retail_gold"],
-            "data_bounds": {
-                "min_date": str(data_min),
-                "max_date": str(data_max)
-            },
-        },
-    }
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
     }
 
-    resp = requests.post(url, headers=headers, json=payload)
-    if resp.status_code != 200:
-        raise GenieError(f"Genie start failed: {resp.status_code} {resp.text}")
+    conv_id = msg_id = None
+
+    # 1a. Follow-up in the session's existing conversation
+    if session_id:
+        conv_id = CONVERSATIONS.get(session_id)
+    if conv_id:
+        resp = http.post(f"{base}/conversations/{conv_id}/messages", headers=headers,
+                         json={"content": nl_query}, timeout=30)
+        if resp.status_code in (404, 410):
+            # conversation expired or was deleted server-side; start over
+            CONVERSATIONS.drop(session_id)
+            conv_id = None
+        elif resp.status_code != 200:
+            # throttled or failing: keep the conversation for the next question
+            raise GenieError(f"Genie follow-up failed: {resp.status_code} {resp.text}")
+        else:
+            body = resp.json()
+            msg_id = body.get("message_id") or body.get("id")
+            if not msg_id:
+                raise GenieError(f"Genie follow-up returned no message ID: {body}")
+
+    # 1b. Start a conversation
+    if not conv_id:
+        payload = {
+            "content": nl_query,
+            "hints": {
+                "catalog": "main",
+                "schemas": ["retail_gold"],
+                "data_bounds": {
+                    "min_date": str(data_min),
+                    "max_date": str(data_max)
+                },
+            },
+        }
+        resp = http.post(f"{base}/start-conversation", headers=headers, json=payload, timeout=30)
+        if resp.status_code != 200:
+            raise GenieError(f"Genie start failed: {resp.status_code} {resp.text}")
 
-    body = resp.json()
-    conv_id = body.get("conversation_id")
-    msg_id  = body.get("message_id")
-    if not (conv_id and msg_id):
-        raise GenieError(f"Genie start returned no IDs: {body}")
+        body = resp.json()
+        conv_id = body.get("conversation_id")
+        msg_id  = body.get("message_id")
+        if not (conv_id and msg_id):
+            raise GenieError(f"Genie start returned no IDs: {body}")
+        if session_id:
+            CONVERSATIONS.put(session_id, conv_id)
 
     # 2. Poll for results
-    poll_url = f"{host}api/2.0/genie/spaces/{space_id}/conversations/{conv_id}/messages/{msg_id}"
-    for _ in range(3):
-        poll = requests.get(poll_url, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+    poll_url = f"{base}/conversations/{conv_id}/messages/{msg_id}"
+    for _ in range(GENIE_POLL_ATTEMPTS):
+        poll = http.get(poll_url, headers={"Authorization": f"Bearer {token}"}, timeout=30)
         if poll.status_code != 200:
             raise GenieError(f"Genie poll failed: {poll.status_code} {poll.text}")
         body = poll.json()
         if body:
-            status = body.get("status")
-            if 'COMPLETED' in body.get("status"):
+            status = body.get("status") or ""
+            if 'COMPLETED' in status:
                 sql_text = body["attachments"][0]['query']['query']
                 return sql_text.strip()
-                break
+            if status in ("FAILED", "CANCELLED"):
+                raise GenieError(f"Genie message {status.lower()}: {body.get('error')}")
 
-        time.sleep(3)
+        time.sleep(GENIE_POLL_INTERVAL)
 
     raise GenieError("Genie did not return SQL in time")
@@ -0,0 +1,80 @@
+import threading, time
+from providers import genie_provider, rules_provider
+
+
+def is_fallback(sql_text: str, fqtn: str) -> bool:
+    """The rules engine's 'no idea' answer: a raw preview of the table."""
+    return " ".join(sql_text.split()) == f"SELECT * FROM {fqtn} LIMIT 100"
+
+
+def rules_tier(nl_query: str, fqtn: str, data_min, data_max, as_spec: bool = False):
+    """Rules SQL, or None on a miss. With `as_spec`, time series come back as
+    their TimeSeriesSpec, so callers get SQL and spec from one pass."""
+    answer = rules_provider.translate(nl_query, fqtn, data_min, data_max, as_spec=as_spec)
+    if isinstance(answer, str) and is_fallback(answer, fqtn):
+        return None
+    return answer
+
+
+DEFAULT_TIERS = [
+    ("rules", rules_tier),
+    ("genie", genie_provider.translate),
+]
+
+_lock = threading.Lock()
+_stats: dict[str, dict] = {}
+
+
+def _record(tier: str, hit: bool, seconds: float):
+    with _lock:
+        s = _stats.setdefault(tier, {"calls": 0, "hits": 0, "seconds": 0.0})
+        s["calls"] += 1
+        s["hits"] += int(hit)
+        s["seconds"] += seconds
+
+
+def translate(nl_query: str, fqtn: str, data_min, data_max, tiers=None) -> tuple[str, str]:
+    """
+    Try each (name, fn) tier in order; a tier misses by returning None.
+    Returns (answer, tier_name). The last tier's answer is always taken.
+    RulesRefusal (e.g. year out of range) is a confident refusal: counted as
+    a hit and raised to the caller rather than escalated. Any other error
+    (a Genie outage, a malformed response) counts as a miss and propagates.
+    """
+    tiers = tiers or DEFAULT_TIERS
+    for i, (name, fn) in enumerate(tiers):
+        t0 = time.perf_counter()
+        try:
+            sql_text = fn(nl_query, fqtn, data_min, data_max)
+        except rules_provider.RulesRefusal:
+            _record(name, True, time.perf_counter() - t0)
+            raise
+        except Exception:
+            _record(name, False, time.perf_counter() - t0)
+            raise
+        hit = sql_text is not None
+        _record(name, hit, time.perf_counter() - t0)
+        if hit or i == len(tiers) - 1:
+            return sql_text, name
+    raise RuntimeError("router has no tiers")
+
+
+def stats() -> list[dict]:
+    """Per-tier calls, hit rate and mean latency since process start."""
+    with _lock:
+        rows = [(name, dict(s)) for name, s in _stats.items()]
+    return [
+        {
+            "tier": name,
+            "calls": s["calls"],
+            "hits": s["hits"],
+            "hit_rate": s["hits"] / s["calls"] if s["calls"] else 0.0,
+            "avg_ms": 1000 * s["seconds"] / s["calls"] if s["calls"] else 0.0,
+        }
+        for name, s in rows
+    ]
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
@@ -1,166 +1,311 @@
 import re
+from functools import lru_cache
+from typing import NamedTuple
+from config.registry import REGISTRY
+from providers.value_index import ValueIndex
 
-def translate(nl_query: str, fqtn: str, data_min, data_max) -> str:
+# Compiled once from the semantic layer; translate() only does dict lookups
+# and a handful of precompiled regex searches.
+METRIC_ALIAS  = REGISTRY.metric_alias
+DIM_PATTERNS  = REGISTRY.dim_patterns
+_METRIC_RE    = REGISTRY.metric_alias_re
+_GRAIN_RE     = re.compile(r"\bby (month|quarter|year)\b")
+_BY_DIM_RE    = re.compile(
+    r"\bby ([a-z ]+?)\b($| in | for | of | from | at | last |\d| top | and | with )"
+)
+_TOPN_RE      = re.compile(r"\btop\s+(\d+)\b")
+_YEAR_RE      = re.compile(r"\bin\s+(20\d{2}|19\d{2})\b")
+_ANY_YEAR_RE  = re.compile(r"\b(?:19|20)\d{2}\b")
+_LAST_N_RE    = re.compile(r"\blast\s+(\d+)\s+months?\b")
+_BY_SEGMENT_RE = re.compile(r"\bby\s+segment(s)?\b")
+# "sales in california by month" -> "california"; "profit for staples" -> "staples";
+# "in san francisco and seattle" -> "san francisco and seattle" (split by resolve_values)
+_VALUE_SPAN_RE = re.compile(
+    r"\b(?:in|for|of|from|at)\s+(?:the\s+)?(.+?)"
+    r"(?=\s+(?:by|in|for|of|from|at|last|top|with|vs|versus)\b|$)"
+)
+_LIST_SEP_RE = re.compile(r"\s*(?:,|&|\band\b|\bor\b)\s*")
+_COMPARE_RE = re.compile(r"\s+(?:vs|versus)\b")
+# intents the rules have no query shape for: counts, averages, rankings of
+# periods, explanations and comparisons must not collapse into a plain SUM
+_UNMODELED_RE = re.compile(
+    r"\b(?:how many|count|number of|average|avg|mean|median|best|worst"
+    r"|why|vs|versus|compare[ds]?|comparison|between)\b"
+)
+_FUZZY_MIN_CHARS = 4
+
+
+class RulesRefusal(ValueError):
+    """The rules understood the question and know it has no answer (e.g. a
+    year outside the data): shown to the user instead of asking Genie."""
+
+
+def _lit(value: str) -> str:
+    """Quote a warehouse value as a Spark SQL string literal."""
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+@lru_cache(maxsize=8)
+def _value_filter_re(dim: str, prefix: str, version: int):
+    alt = REGISTRY.value_alternation(dim)
+    return re.compile(rf"{prefix}{alt}s?\b") if alt else None
+
+
+@lru_cache(maxsize=1)
+def _value_index(version: int) -> ValueIndex:
+    return ValueIndex(REGISTRY.all_dimension_values(), list(REGISTRY.dimensions))
+
+
+def resolve_value(phrase: str) -> tuple[str, str, str] | None:
+    """
+    Resolve a free-text phrase to (dimension, value, matched_text).
+    Tries exact matches on the longest leading sub-phrase first, then a
+    fuzzy match on the phrase up to the first list separator.
+    """
+    index = _value_index(REGISTRY.version)
+    words = phrase.split()
+    for n in range(len(words), 0, -1):
+        matched = " ".join(words[:n]).rstrip(",")
+        hit = index.exact(matched)
+        if hit:
+            return hit[0], hit[1], matched
+    phrase = _LIST_SEP_RE.split(phrase, 1)[0]
+    if len(phrase) < _FUZZY_MIN_CHARS or any(ch.isdigit() for ch in phrase):
+        return None
+    if _names_metric_or_dim(phrase):
+        return None
+    hit = index.lookup(phrase)
+    return (hit[0], hit[1], phrase) if hit else None
+
+
+def _names_metric_or_dim(text: str) -> bool:
+    # phrases naming a metric or dimension ("each region") are not values
+    return bool(_METRIC_RE.search(text) or any(pat.search(text) for pat, _ in DIM_PATTERNS))
+
+
+def resolve_values(phrase: str) -> tuple[list[tuple[str, str, str]], str]:
+    """
+    Resolve a list of values ("san francisco, seattle and portland") to
+    resolve_value() hits, stopping at the first item that isn't a value.
+    Returns (hits, unresolved_rest).
+    """
+    hits, rest = [], phrase
+    while rest:
+        hit = resolve_value(rest)
+        if not hit:
+            break
+        hits.append(hit)
+        rest = rest[len(hit[2]):]
+        sep = _LIST_SEP_RE.match(rest)
+        if not sep or sep.end() == 0:
+            break
+        rest = rest[sep.end():]
+    return hits, rest.strip()
+
+
+class TimeSeriesSpec(NamedTuple):
+    """
+    A rules-generated time series: one row per `grain` period of `order_date`.
+    A "last N months" window is kept apart from `filters`, since its bounds
+    move with `data_max`: `stable()` is the same spec without that bound.
+    """
+    grain: str
+    agg: str
+    filters: tuple[str, ...]
+    fqtn: str
+    last_n_months: int | None = None
+    data_max: object = None
+
+    def stable(self) -> "TimeSeriesSpec":
+        return self._replace(data_max=None)
+
+    def sql(self, since=None) -> str:
+        """The query for the whole series, or only periods starting at/after `since`."""
+        parts = list(self.filters)
+        if self.last_n_months:
+            parts.append(_last_n_months_sql(self.last_n_months, self.data_max))
+        if since is not None:
+            parts.append(f"order_date >= date '{since}'")
+        where = ("WHERE " + " AND ".join(parts)) if parts else ""
+        return f"""
+        SELECT date_trunc('{self.grain}', order_date) AS {self.grain}, {self.agg}
+        FROM {self.fqtn}
+        {where}
+        GROUP BY {self.grain}
+        ORDER BY {self.grain}
+        """.strip()
+
+
+def _last_n_months_sql(n: int, data_max) -> str:
+    return f"order_date BETWEEN add_months(date '{data_max}', -{n}) AND date '{data_max}'"
+
+
+def timeseries_spec(nl_query: str, fqtn: str, data_min, data_max) -> TimeSeriesSpec | None:
+    """The TimeSeriesSpec translate() would use for this question, or None."""
+    answer = translate(nl_query, fqtn, data_min, data_max, as_spec=True)
+    return answer if isinstance(answer, TimeSeriesSpec) else None
+
+
+def translate(nl_query: str, fqtn: str, data_min, data_max, as_spec: bool = False):
     """
     Port of your genie_to_sql() with identical behavior, except:
     - data_min/data_max are passed in (no Streamlit cache dependency here)
+    - metrics, dimensions and filter values come from config/semantic_layer.json
+    - as_spec=True returns the TimeSeriesSpec for time-series questions (SQL for the rest)
+    - raises RulesRefusal for questions it can tell have no answer
     """
     q = " ".join(nl_query.strip().lower().split())
+    miss = f"SELECT * FROM {fqtn} LIMIT 100"
 
-    metric_alias = {
-        "sales": "sales", "revenue": "sales", "profit": "profit",
-        "quantity": "quantity", "qty": "quantity", "discount": "discount",
-        "profit margin": "profit_margin", "margin": "profit_margin", "profit %": "profit_margin",
-    }
-    DIM_PATTERNS = [
-        (r"\bcustomer(s)?( name(s)?)?\b", "customer_name"),
-        (r"\bproduct(s)?( name(s)?)?\b", "product_name"),
-        (r"\bcategory\b", "category"),
-        (r"\bsubcategory\b", "subcategory"),
-        (r"\bregion(s)?\b", "region"),
-        (r"\bsegment(s)?\b", "segment"),
-        (r"\bstate(s)?\b", "state"),
-        (r"\bcit(y|ies)\b", "city"),
-        (r"\bship[ _]?mode(s)?\b", "ship_mode"),
-    ]
-    region_vals  = {"west":"West", "east":"East", "central":"Central", "south":"South"}
-    segment_vals = {"consumer":"Consumer", "corporate":"Corporate",
-                    "home office":"Home Office", "homeoffice":"Home Office"}
+    # year_filter() keeps only the first year: "2016 vs 2017" is not ours
+    if len(set(_ANY_YEAR_RE.findall(q))) > 1:
+        return miss
 
     def pick_metric(text: str) -> str:
         if "profit margin" in text or "profit %" in text:  # prefer two-word match
             return "profit_margin"
-        for k, v in metric_alias.items():
-            if re.search(rf"\b{k}\b", text):
+        found = set(_METRIC_RE.findall(text))
+        for k, v in METRIC_ALIAS.items():
+            if k in found:
                 return v
         return "sales"
 
     def pick_grain(text: str) -> str | None:
-        if re.search(r"\bby month\b", text):   return "month"
-        if re.search(r"\bby quarter\b", text): return "quarter"
-        if re.search(r"\bby year\b", text):    return "year"
-        return None
+        m = _GRAIN_RE.search(text)
+        return m.group(1) if m else None
 
     def pick_dim(text: str) -> str | None:
-        m = re.search(r"\bby ([a-z ]+?)\b($| in | last |\d| top | and | with )", text)
+        m = _BY_DIM_RE.search(text)
         if m:
             cand = m.group(1).strip()
             for pat, col in DIM_PATTERNS:
-                if re.search(pat, cand):
+                if pat.search(cand):
                     return col
         for pat, col in DIM_PATTERNS:
-            if re.search(pat, text):
+            if pat.search(text):
                 return col
         return None
 
     def pick_topn(text: str) -> int | None:
-        m = re.search(r"\btop\s+(\d+)\b", text)
+        m = _TOPN_RE.search(text)
         return int(m.group(1)) if m else None
 
     def year_filter(text: str) -> str | None:
-        m = re.search(r"\bin\s+(20\d{2}|19\d{2})\b", text)
+        m = _YEAR_RE.search(text)
         if not m:
             return None
         y = int(m.group(1))
         if y < data_min.year or y > data_max.year:
-            raise ValueError(f"No data for {y}. Data covers {data_min} to {data_max}.")
+            raise RulesRefusal(f"No data for {y}. Data covers {data_min} to {data_max}.")
         return f"year(order_date) = {y}"
 
-    def last_n_months_filter(text: str) -> str | None:
-        m = re.search(r"\blast\s+(\d+)\s+months?\b", text)
-        if not m:
-            return None
-        n = int(m.group(1))
-        return (
-            f"order_date BETWEEN add_months(date '{data_max}', -{n}) AND date '{data_max}'"
-        )
+    def last_n_months(text: str) -> int | None:
+        m = _LAST_N_RE.search(text)
+        return int(m.group(1)) if m else None
 
     def region_filter(text: str) -> str | None:
-        m = re.search(r"\bin\s+(west|east|central|south)\b", text)
+        pat = _value_filter_re("region", r"\bin\s+", REGISTRY.version)
+        m = pat.search(text) if pat else None
         if m:
-            return f"region = '{region_vals[m.group(1)]}'"
+            return f"{REGISTRY.dim_column['region']} = {_lit(REGISTRY.canonical_value('region', m.group(1)))}"
         return None
 
     def segment_filter(text: str) -> str | None:
-        if re.search(r"\bby\s+segment(s)?\b", text):
+        if _BY_SEGMENT_RE.search(text):
             return None
-        m = re.search(r"\bsegment(s)?\s+(consumer|corporate|home[ _]?office)s?\b", text)
+        pat = _value_filter_re("segment", r"\bsegments?\s+", REGISTRY.version)
+        m = pat.search(text) if pat else None
         if m:
-            v = m.group(2).replace(" ", "").lower()
-            return {
-                "consumer":   "segment = 'Consumer'",
-                "corporate":  "segment = 'Corporate'",
-                "homeoffice": "segment = 'Home Office'",
-            }[v]
+            return f"{REGISTRY.dim_column['segment']} = {_lit(REGISTRY.canonical_value('segment', m.group(1)))}"
         return None
 
+    def value_filters(text: str) -> tuple[dict[str, list[str]], str] | None:
+        """
+        Dimension values named in the text (column -> values), plus the text
+        with them removed. None when a value list trails off into words that
+        are neither values nor metrics/dimensions ("in california and narnia")
+        or into a comparison ("california vs texas"): the rules can't answer
+        those faithfully, so the question is left to the next tier.
+        """
+        found, rest = {}, text
+        for m in _VALUE_SPAN_RE.finditer(text):
+            hits, unresolved = resolve_values(m.group(1))
+            if not hits:
+                continue
+            if unresolved and not _names_metric_or_dim(unresolved):
+                return None
+            if _COMPARE_RE.match(text, m.end()):
+                return None
+            for dim, value, matched in hits:
+                rest = rest.replace(matched, " ", 1)
+                vals = found.setdefault(REGISTRY.dim_column[dim], [])
+                if value not in vals:
+                    vals.append(value)
+        return found, rest
+
+    def value_clause(col: str, values: list[str]) -> str:
+        if len(values) == 1:
+            return f"{col} = {_lit(values[0])}"
+        return f"{col} IN ({', '.join(_lit(v) for v in values)})"
+
     def where_clause(parts: list[str]) -> str:
         parts = [p for p in parts if p]
         return ("WHERE " + " AND ".join(parts)) if parts else ""
 
-    metric = pick_metric(q)
-    grain  = pick_grain(q)
-    dim    = pick_dim(q)
-    topn   = pick_topn(q)
-
-    if topn and not dim:
-        if re.search(r"\bproducts?\b", q):   dim = "product_name"
-        elif re.search(r"\bcustomers?\b", q): dim = "customer_name"
-
+    months = last_n_months(q)
     filters = [
         year_filter(q),
-        last_n_months_filter(q),
+        _last_n_months_sql(months, data_max) if months else None,
         region_filter(q),
         segment_filter(q),
     ]
+    resolved = value_filters(q)
+    if resolved is None:
+        return miss
+    found, q_dims = resolved
+    for i in (2, 3):
+        col = filters[i].split(" = ", 1)[0] if filters[i] else None
+        if col in found:
+            # same single value as the region/segment rule: keep that clause
+            if filters[i] == value_clause(col, found[col]):
+                del found[col]
+            else:
+                filters[i] = None
+    filters += [value_clause(col, vals) for col, vals in found.items()]
     where = where_clause(filters)
 
-    def agg_expr(m: str) -> str:
-        if m == "profit_margin":
-            return ("SUM(profit) AS profit, "
-                    "SUM(sales)  AS sales, "
-                    "CASE WHEN SUM(sales)=0 THEN NULL ELSE SUM(profit)/SUM(sales) END AS profit_margin")
-        elif m in ("sales", "profit", "quantity", "discount"):
-            return f"SUM({m}) AS {m}"
-        return "SUM(sales) AS sales"
+    metric = pick_metric(q)
+    grain  = pick_grain(q)
+    dim    = pick_dim(q_dims)
+    topn   = pick_topn(q)
+
+    if topn and not dim:
+        if re.search(r"\bproducts?\b", q_dims):   dim = "product_name"
+        elif re.search(r"\bcustomers?\b", q_dims): dim = "customer_name"
+
+    agg_expr = REGISTRY.agg_expr
 
     def order_by_for(m: str, key_alias: str) -> str:
         if key_alias in ("month", "quarter", "year", "period"):
             return f"ORDER BY {key_alias}"
-        if m == "profit_margin":
-            return "ORDER BY profit_margin DESC NULLS LAST"
-        return f"ORDER BY {m} DESC"
+        return f"ORDER BY {m} {REGISTRY.metric_order.get(m, 'DESC')}"
 
     # --- Grains (time series) ---
     if grain:
-        dt = {"month":"month", "quarter":"quarter", "year":"year"}[grain]
-        trunc = {
-            "month":   "date_trunc('month', order_date)",
-            "quarter": "date_trunc('quarter', order_date)",
-            "year":    "date_trunc('year', order_date)",
-        }[grain]
         wants_multi = ("sales and profit" in q) or ("profit and sales" in q)
         agg = "SUM(sales) AS sales, SUM(profit) AS profit" if (wants_multi and metric in ("sales","profit")) else agg_expr(metric)
-        return f"""
-        SELECT {trunc} AS {dt}, {agg}
-        FROM {fqtn}
-        {where}
-        GROUP BY {dt}
-        {order_by_for(metric, dt)}
-        """.strip()
+        static = tuple(p for i, p in enumerate(filters) if p and i != 1)
+        spec = TimeSeriesSpec(grain, agg, static, fqtn, months, data_max if months else None)
+        return spec if as_spec else spec.sql()
 
     # --- Profit margin by dimension ---
     if metric == "profit_margin" and dim:
         return f"""
-        SELECT
-          {dim},
-          SUM(profit) AS profit,
-          SUM(sales)  AS sales,
-          CASE WHEN SUM(sales)=0 THEN NULL ELSE SUM(profit)/SUM(sales) END AS profit_margin
+        SELECT {dim}, {agg_expr(metric)}
         FROM {fqtn}
         {where}
         GROUP BY {dim}
-        ORDER BY profit_margin DESC NULLS LAST
+        {order_by_for(metric, dim)}
         """.strip()
 
     # --- Top-N ---
@@ -221,5 +366,14 @@ def translate(nl_query: str, fqtn: str, data_min, data_max) -> str:
         {where}
         """.strip()
 
+    # --- Filtered totals ("sales in california", "profit for staples") ---
+    # only for an explicitly named metric: "how many orders in 2015" is not SUM(sales)
+    if where and _METRIC_RE.search(q) and not _UNMODELED_RE.search(q):
+        return f"""
+        SELECT {agg_expr(metric)}
+        FROM {fqtn}
+        {where}
+        """.strip()
+
     # --- Fallback ---
-    return f"SELECT * FROM {fqtn} LIMIT 100"
+    return miss
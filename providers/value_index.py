@@ -0,0 +1,143 @@
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _osa_distance(a: str, b: str) -> int:
+    """Edit distance counting an adjacent transposition as one edit."""
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class ValueIndex:
+    """
+    In-memory index over dimension values for fast filter resolution.
+
+    Exact lookups are a single dict hit on the normalized phrase; fuzzy
+    lookups score candidates sharing trigrams with the phrase (Dice
+    coefficient), so only values with some overlap are ever compared.
+    Candidates of similar length are also scored by edit distance, which
+    forgives typos and transpositions ("califronia") that break several
+    trigrams at once; pairs shorter than `min_edit_chars` skip that, so
+    "east" never becomes "West".
+    To keep misses cheap, only candidates of comparable length that share at
+    least half the phrase's trigrams are scored, at most `max_edit_candidates`
+    of them reach edit distance, and phrases longer than `max_fuzzy_chars`
+    are only matched exactly.
+    `dims` is the tie-break order when a value exists in several dimensions.
+    """
+
+    def __init__(self, values: dict[str, list[str]], dims: list[str] | None = None,
+                 min_score: float = 0.75, min_edit_chars: int = 5,
+                 max_fuzzy_chars: int = 60, max_edit_candidates: int = 32):
+        self.min_score = min_score
+        self.min_edit_chars = min_edit_chars
+        self.max_fuzzy_chars = max_fuzzy_chars
+        self.max_edit_candidates = max_edit_candidates
+        rank = {d: i for i, d in enumerate(dims or values)}
+        self._entries: list[tuple[str, str, int, str]] = []   # (dim, value, n_grams, key)
+        self._exact: dict[str, tuple[str, str]] = {}
+        self._grams: dict[str, list[int]] = defaultdict(list)
+
+        for dim in sorted(values, key=lambda d: rank.get(d, len(rank))):
+            for value in values[dim]:
+                key = normalize(value)
+                if not key:
+                    continue
+                # first dimension (by priority) wins an exact collision
+                self._exact.setdefault(key, (dim, value))
+                grams = _trigrams(key)
+                idx = len(self._entries)
+                self._entries.append((dim, value, len(grams), key))
+                for g in grams:
+                    self._grams[g].append(idx)
+
+        # posting lists ordered by value length, so lookup() can bisect out
+        # the candidates too short or too long to ever reach min_score
+        self._gram_lens: dict[str, list[int]] = {}
+        for g, idxs in self._grams.items():
+            idxs.sort(key=lambda i: len(self._entries[i][3]))
+            self._gram_lens[g] = [len(self._entries[i][3]) for i in idxs]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def exact(self, phrase: str) -> tuple[str, str] | None:
+        return self._exact.get(normalize(phrase))
+
+    def lookup(self, phrase: str) -> tuple[str, str, float] | None:
+        """Best (dim, value, score) for `phrase`, or None below min_score."""
+        key = normalize(phrase)
+        if not key:
+            return None
+        hit = self._exact.get(key)
+        if hit:
+            return hit[0], hit[1], 1.0
+
+        if len(key) > self.max_fuzzy_chars:
+            return None
+
+        grams = _trigrams(key)
+        # Dice >= min_score needs lengths within a factor of (2 - s) / s;
+        # the +-2 slack keeps the edit-distance window (transpositions, typos)
+        ratio = (2.0 - self.min_score) / self.min_score
+        lo, hi = int(len(key) / ratio) - 2, int(len(key) * ratio) + 2
+        overlap: dict[int, int] = defaultdict(int)
+        for g in grams:
+            idxs = self._grams.get(g)
+            if not idxs:
+                continue
+            lens = self._gram_lens[g]
+            for idx in idxs[bisect_left(lens, lo):bisect_right(lens, hi)]:
+                overlap[idx] += 1
+
+        # below half the phrase's trigrams Dice can't reach min_score; short
+        # phrases may still be one transposition (up to 4 trigrams) away
+        min_shared = max(1, min((len(grams) + 1) // 2, len(grams) - 4))
+        best, best_score = None, self.min_score
+        edit_candidates = []
+        for idx, shared in overlap.items():
+            if shared < min_shared:
+                continue
+            _, _, n_grams, cand = self._entries[idx]
+            score = 2.0 * shared / (len(grams) + n_grams)
+            if score > best_score or (score == best_score and best is not None and idx < best):
+                best, best_score = idx, score
+            if (abs(len(cand) - len(key)) <= 2
+                    and min(len(cand), len(key)) >= self.min_edit_chars):
+                edit_candidates.append((shared, idx))
+
+        # closest by trigrams first; the rest are too far apart to win
+        edit_candidates.sort(key=lambda c: (-c[0], c[1]))
+        for shared, idx in edit_candidates[:self.max_edit_candidates]:
+            _, _, n_grams, cand = self._entries[idx]
+            longest = max(len(cand), len(key))
+            # one edit breaks at most 4 trigrams: skip pairs too far apart to win
+            max_edits = int((1.0 - best_score) * longest)
+            if shared < max(len(grams), n_grams) - 4 * max_edits:
+                continue
+            score = 1.0 - _osa_distance(key, cand) / longest
+            if score > best_score or (score == best_score and best is not None and idx < best):
+                best, best_score = idx, score
+        if best is None:
+            return None
+        dim, value, _, _ = self._entries[best]
+        return dim, value, best_score
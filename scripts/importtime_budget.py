@@ -0,0 +1,100 @@
+"""
+Startup import-time budget for the app modules.
+
+Runs `python -X importtime` on every app/config/providers module that
+app/main.py and app/pages/*.py import outside functions (read from their
+source, so new pages and imports are covered; streamlit itself is imported
+first and excluded, it is paid regardless), then fails if
+
+- any module in DEFERRED is imported at start-up, or
+- the app's own cumulative import time exceeds the budget.
+
+pandas, altair, pyarrow, databricks.sql and requests are imported inside the
+functions that first need them (first chart, first query, first Genie call,
+first cache write). Measured on a dev box (Python 3.11, pandas 3.0,
+streamlit 1.66), median of 5 runs:
+
+    before: pandas + app.db + app.data_bounds + app.ui + genie_provider  ~500 ms
+    after:  all app/provider modules                                       ~15 ms
+
+Usage (from the repo root):
+
+    python scripts/importtime_budget.py [--budget-ms 100] [--runs 5]
+
+tests/test_importtime.py runs the same check under pytest.
+"""
+import argparse, ast, glob, os, re, statistics, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_SCRIPTS = ("app/main.py", "app/pages/*.py")
+_OWN_PACKAGES = ("app", "config", "providers")
+# reads st.secrets at import (and only needs os/uuid/streamlit)
+_SKIP = {"app.bootstrap"}
+DEFERRED = ("pandas", "altair", "pyarrow", "databricks.sql", "requests")
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def _is_module(name: str) -> bool:
+    path = os.path.join(ROOT, *name.split("."))
+    return os.path.exists(path + ".py") or os.path.isdir(path)
+
+
+def _imports(node) -> list[str]:
+    """Modules imported by `node`, except inside function bodies (deferred)."""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+        return []
+    if isinstance(node, ast.Import):
+        return [a.name for a in node.names]
+    if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+        subs = [f"{node.module}.{a.name}" for a in node.names]
+        return [node.module] + [m for m in subs if _is_module(m)]
+    return [m for child in ast.iter_child_nodes(node) for m in _imports(child)]
+
+
+def startup_modules() -> list[str]:
+    """Own modules the Streamlit entry points import when a page loads."""
+    found = set()
+    for pattern in STARTUP_SCRIPTS:
+        for path in sorted(glob.glob(os.path.join(ROOT, pattern))):
+            with open(path, encoding="utf-8") as f:
+                found.update(_imports(ast.parse(f.read(), path)))
+    return sorted(m for m in found - _SKIP if m.split(".")[0] in _OWN_PACKAGES)
+
+
+def measure(modules: list[str]) -> tuple[float, set[str]]:
+    """One cold interpreter: (ms spent in top-level app imports, modules imported)."""
+    code = "import streamlit; " + "; ".join(f"import {m}" for m in modules)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, env=env, check=True).stderr
+    total_us, seen = 0, set()
+    for line in out.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        cumulative, indent, name = int(m.group(2)), len(m.group(3)) - 1, m.group(4)
+        seen.add(name)
+        if indent == 0 and name.startswith(("app", "config", "providers")):
+            total_us += cumulative
+    return total_us / 1000, seen
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "100")))
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    modules = startup_modules()
+    runs = [measure(modules) for _ in range(args.runs)]
+    ms = statistics.median(r[0] for r in runs)
+    leaked = sorted(m for m in DEFERRED if any(m in seen for _, seen in runs))
+
+    print(f"app import time: {ms:.1f} ms (median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    if leaked:
+        print("imported at start-up but should be deferred: " + ", ".join(leaked))
+    return 0 if ms <= args.budget_ms and not leaked else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Local stand-in for the Genie conversation API (http.server, one thread)."""
+import itertools, json, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGenie:
+    """
+    Serves start-conversation, follow-up messages and message polling for one
+    space. Answers are `SELECT '<conversation>:<question>'`, so tests can tell
+    which conversation a question landed in. `delete(conv_id)` makes the
+    conversation 404 like an expired one; `fail_next(status)` fails the next
+    follow-up POST with that status.
+    """
+
+    def __init__(self):
+        self.conversations: dict[str, list[str]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self._fail: list[int] = []
+        self._ids = itertools.count(1)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def delete(self, conv_id: str):
+        self.conversations.pop(conv_id, None)
+
+    def fail_next(self, status: int):
+        self._fail.append(status)
+
+    def _handler(self):
+        genie = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                genie.requests.append(("POST", self.path))
+                parts = self.path.rstrip("/").split("/")
+                if parts[-1] == "start-conversation":
+                    conv_id = f"c{next(genie._ids)}"
+                    genie.conversations[conv_id] = [body["content"]]
+                    return self._send(200, {"conversation_id": conv_id, "message_id": "0"})
+                if parts[-1] == "messages":
+                    conv_id = parts[-2]
+                    if genie._fail:
+                        return self._send(genie._fail.pop(0), {"error": "unavailable"})
+                    if conv_id not in genie.conversations:
+                        return self._send(404, {"error": "conversation not found"})
+                    genie.conversations[conv_id].append(body["content"])
+                    return self._send(200, {"id": str(len(genie.conversations[conv_id]) - 1)})
+                return self._send(404, {})
+
+            def do_GET(self):
+                genie.requests.append(("GET", self.path))
+                parts = self.path.rstrip("/").split("/")
+                conv_id, msg_id = parts[-3], int(parts[-1])
+                if conv_id not in genie.conversations:
+                    return self._send(404, {"error": "conversation not found"})
+                question = genie.conversations[conv_id][msg_id]
+                return self._send(200, {
+                    "status": "COMPLETED",
+                    "attachments": [{"query": {"query": f" SELECT '{conv_id}:{question}' "}}],
+                })
+
+        return Handler
@@ -0,0 +1,102 @@
+import datetime as dt
+import pandas as pd
+import pytest
+from app import cache
+from app.normalize import normalize_result
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    mem = cache.MemoryCache()
+    monkeypatch.setattr(cache, "get_cache", lambda: mem)
+    return mem
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        cache.CacheBackend()
+
+
+def test_memory_cache_is_bounded_by_bytes():
+    mem = cache.MemoryCache(max_entries=100, max_bytes=10)
+    mem.set("a", b"12345")
+    mem.set("b", b"12345")
+    mem.set("c", b"123")
+    assert mem.get("a") is None and mem.get("b") and mem.get("c")
+    assert mem.nbytes == 8
+    mem.set("huge", b"x" * 11)
+    assert mem.get("huge") is None and mem.nbytes == 8
+
+
+def test_ttl_cache_round_trips_dates_as_json(backend):
+    calls = []
+
+    @cache.ttl_cache(60)
+    def bounds():
+        calls.append(1)
+        return dt.date(2014, 1, 3), dt.date(2017, 12, 30)
+
+    assert bounds() == (dt.date(2014, 1, 3), dt.date(2017, 12, 30))
+    (blob,) = [v for _, v in backend._data.values()]
+    assert b"$date" in blob and cache.loads_json(blob) == [dt.date(2014, 1, 3), dt.date(2017, 12, 30)]
+
+
+def test_ttl_cache_clear_drops_backend_entries(backend):
+    calls = []
+
+    @cache.ttl_cache(60)
+    def f(x):
+        calls.append(x)
+        return x
+
+    f(1)
+    f.cache_clear()
+    f(1)
+    assert calls == [1, 1]
+
+
+def test_frame_and_meta_round_trip_without_pickle():
+    pdf = normalize_result(pd.DataFrame({"region": ["West", "East"] * 3, "sales": [1.5] * 6}))
+    out, meta = cache.loads_df_meta(cache.dumps_df(pdf, meta={"data_max": dt.date(2017, 12, 30)}))
+    assert meta == {"data_max": dt.date(2017, 12, 30)}
+    assert out.attrs.get("normalized") and out.equals(pdf)
+
+
+def test_sqlite_reads_touch_accessed_coarsely(tmp_path):
+    db = cache.SQLiteCache(str(tmp_path / "c.sqlite3"))
+    db.set("k", b"v")
+    conn = db._conn()
+    conn.execute("UPDATE cache SET accessed = accessed - 5")
+    before = conn.execute("SELECT accessed FROM cache").fetchone()[0]
+    assert db.get("k") == b"v"
+    assert conn.execute("SELECT accessed FROM cache").fetchone()[0] == before
+    conn.execute("UPDATE cache SET accessed = accessed - ?", (db.TOUCH_INTERVAL,))
+    db.get("k")
+    assert conn.execute("SELECT accessed FROM cache").fetchone()[0] > before
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    db.delete_prefix("k")
+    assert db.get("k") is None
+
+
+def test_sqlite_skips_oversized_entries_and_survives_errors(tmp_path, caplog):
+    db = cache.SQLiteCache(str(tmp_path / "c.sqlite3"), max_entry_bytes=4)
+    db.set("big", b"12345")
+    db.set("k", b"1234")
+    assert db.get("big") is None and db.get("k") == b"1234"
+    db._conn().execute("DROP TABLE cache")
+    db.set("k", b"v")
+    assert db.get("k") is None
+    assert "cache write failed" in caplog.text and "cache read failed" in caplog.text
+
+
+def test_large_results_are_not_encoded(backend, monkeypatch):
+    from app import pipeline
+
+    monkeypatch.setattr(pipeline, "get_cache", lambda: backend)
+    monkeypatch.setattr(pipeline, "RESULT_CACHE_MAX_ROWS", 2)
+    monkeypatch.setattr(pipeline, "_scheduled_fetch",
+                        lambda ticket, sql_text: pd.DataFrame({"n": range(int(sql_text))}))
+    pipeline.execute("3")
+    assert not backend._data
+    pipeline.execute("2")
+    assert len(backend._data) == 1
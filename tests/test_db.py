@@ -0,0 +1,98 @@
+import pytest
+from app import db
+
+
+class FakeConn:
+    def __init__(self, fail=None):
+        self.fail, self.closed = fail, False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCursor:
+    description = [("n",)]
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql_text):
+        if self.conn.fail:
+            raise self.conn.fail
+
+    def fetchall(self):
+        return [(1,)]
+
+
+class SessionExpired(Exception):
+    pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    opened = []
+
+    def connect():
+        opened.append(FakeConn())
+        return opened[-1]
+
+    monkeypatch.setattr(db, "get_conn", connect)
+    monkeypatch.setattr(db, "_connection_lost", lambda e: isinstance(e, SessionExpired))
+    monkeypatch.setattr(db, "_idle", type(db._idle)())
+    return opened
+
+
+def test_idle_connection_is_reused(pool):
+    db.fetch_rows("SELECT 1")
+    db.fetch_rows("SELECT 1")
+    assert len(pool) == 1
+
+
+def test_connection_idle_too_long_is_closed(pool, monkeypatch):
+    db.fetch_rows("SELECT 1")
+    monkeypatch.setattr(db, "WAREHOUSE_CONN_IDLE_SECONDS", -1)
+    db.fetch_rows("SELECT 1")
+    assert len(pool) == 2 and pool[0].closed
+
+
+def test_dead_pooled_connection_retries_once_on_a_fresh_one(pool):
+    db.fetch_rows("SELECT 1")
+    pool[0].fail = SessionExpired("Invalid SessionHandle")
+    assert db.fetch_rows("SELECT 1") == ([(1,)], [("n",)])
+    assert pool[0].closed and len(pool) == 2
+
+
+def test_query_errors_are_not_retried(pool):
+    db.fetch_rows("SELECT 1")
+    pool[0].fail = ValueError("syntax error")
+    with pytest.raises(ValueError):
+        db.fetch_rows("SELECT 1")
+    assert len(pool) == 1
+
+
+def test_query_error_returns_the_connection_to_the_pool(pool):
+    db.fetch_rows("SELECT 1")
+    pool[0].fail = ValueError("syntax error")
+    with pytest.raises(ValueError):
+        db.fetch_rows("SELECT 1")
+    pool[0].fail = None
+    db.fetch_rows("SELECT 1")
+    assert len(pool) == 1 and not pool[0].closed
+
+
+def test_connector_giving_up_is_not_a_lost_connection():
+    dbexc = pytest.importorskip("databricks.sql.exc")
+    assert db._connection_lost(dbexc.SessionAlreadyClosedError("closed"))
+    assert db._connection_lost(dbexc.DatabaseError("Invalid SessionHandle"))
+    assert not db._connection_lost(dbexc.UnsafeToRetryError("request may have run"))
+    assert not db._connection_lost(dbexc.MaxRetryDurationError("retries exhausted"))
+    assert not db._connection_lost(dbexc.ServerOperationError("syntax error"))
@@ -0,0 +1,97 @@
+import datetime as dt
+import pytest
+from providers import genie_provider
+from providers.genie_provider import ConversationRegistry, GenieError
+from tests.fake_genie import FakeGenie
+
+LO, HI = dt.date(2014, 1, 3), dt.date(2017, 12, 30)
+
+
+@pytest.fixture
+def genie(monkeypatch):
+    server = FakeGenie().start()
+    monkeypatch.setenv("DATABRICKS_HOST", server.url)
+    monkeypatch.setenv("DATABRICKS_TOKEN", "token")
+    monkeypatch.setenv("GENIE_SPACE_ID", "space")
+    monkeypatch.setattr(genie_provider, "GENIE_POLL_INTERVAL", 0)
+    monkeypatch.setattr(genie_provider, "CONVERSATIONS", ConversationRegistry(ttl=900, max_size=8))
+    yield server
+    server.stop()
+
+
+def ask(q: str, session_id: str | None = "s1") -> str:
+    return genie_provider.translate(q, "t", LO, HI, session_id=session_id)
+
+
+def test_first_question_starts_a_conversation(genie):
+    assert ask("sales by region") == "SELECT 'c1:sales by region'"
+    assert genie_provider.has_conversation("s1")
+    assert ("POST", "/api/2.0/genie/spaces/space/start-conversation") in genie.requests
+
+
+def test_follow_up_reuses_the_conversation(genie):
+    ask("sales by region")
+    assert ask("and by category?") == "SELECT 'c1:and by category?'"
+    assert genie.conversations["c1"] == ["sales by region", "and by category?"]
+    assert ask("profit by state", session_id=None) == "SELECT 'c2:profit by state'"
+
+
+def test_deleted_conversation_is_restarted(genie):
+    ask("sales by region")
+    genie.delete("c1")
+    assert ask("and by category?") == "SELECT 'c2:and by category?'"
+    assert genie_provider.CONVERSATIONS.get("s1") == "c2"
+
+
+def test_idle_conversation_expires(genie):
+    ask("sales by region")
+    convs = genie_provider.CONVERSATIONS
+    convs._convs["s1"] = ("c1", convs._convs["s1"][1] - 901)
+    assert not genie_provider.has_conversation("s1")
+    assert ask("profit by state") == "SELECT 'c2:profit by state'"
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_throttled_follow_up_raises_and_keeps_the_conversation(genie, status):
+    ask("sales by region")
+    genie.fail_next(status)
+    with pytest.raises(GenieError):
+        ask("and by category?")
+    assert genie_provider.CONVERSATIONS.get("s1") == "c1"
+    assert ask("and by category?") == "SELECT 'c1:and by category?'"
+
+
+def test_follow_up_phrasing_skips_rules_in_a_live_conversation(genie):
+    from app import pipeline
+
+    ask("which customers churned?")
+    sql_text, provider, _ = pipeline.translate_question("and by region?", LO, HI, session_id="s1")
+    assert (sql_text, provider) == ("SELECT 'c1:and by region?'", "Genie")
+    sql_text, provider, _ = pipeline.translate_question("sales by region", LO, HI, session_id="s1")
+    assert provider == "Rules"
+
+
+def test_routing_checks_do_not_keep_a_conversation_alive():
+    convs = ConversationRegistry(ttl=900, max_size=8)
+    convs.put("s1", "c1")
+    convs._convs["s1"] = ("c1", convs._convs["s1"][1] - 600)
+    idle_since = convs._convs["s1"][1]
+    assert convs.peek("s1") == "c1"
+    assert convs._convs["s1"][1] == idle_since
+    assert convs.get("s1") == "c1" and convs._convs["s1"][1] > idle_since
+
+
+@pytest.mark.parametrize("q", ["and by region?", "what about 2016", "same for profit",
+                               "break that down by month", "only the west", "then by state"])
+def test_follow_up_phrasing(q):
+    from app.pipeline import is_follow_up
+
+    assert is_follow_up(q)
+
+
+@pytest.mark.parametrize("q", ["which products have sales above 1000", "customers that bought chairs",
+                               "only sales in west", "is it profitable in texas"])
+def test_standalone_questions_are_not_follow_ups(q):
+    from app.pipeline import is_follow_up
+
+    assert not is_follow_up(q)
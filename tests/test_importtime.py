@@ -0,0 +1,17 @@
+import importlib.util, os
+
+_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts", "importtime_budget.py")
+_spec = importlib.util.spec_from_file_location("importtime_budget", _PATH)
+importtime_budget = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(importtime_budget)
+
+
+def test_startup_modules_follow_the_entry_points():
+    modules = importtime_budget.startup_modules()
+    assert {"app.ui", "app.pipeline", "app.result_store", "app.scheduler"} <= set(modules)
+    assert "app.bootstrap" not in modules
+
+
+def test_startup_import_time_is_within_budget(capsys):
+    rc = importtime_budget.main(["--runs", "3"])
+    assert rc == 0, capsys.readouterr().out
@@ -0,0 +1,58 @@
+import pytest
+from config.registry import load_registry
+from app import dimension_values
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    fresh = load_registry()
+    monkeypatch.setattr(dimension_values, "REGISTRY", fresh)
+    monkeypatch.setattr(dimension_values, "_applied", None)
+    monkeypatch.setattr(dimension_values, "_failed_at", None)
+    return fresh
+
+
+def test_values_are_canonicalized_and_versioned(registry):
+    version = registry.version
+    registry.set_dimension_values({"state": ["New York", "Texas"], "city": []})
+    assert registry.version == version + 1
+    assert registry.canonical_value("state", "new  york") == "New York"
+    assert registry.canonical_value("state", "NewYork") == "New York"
+    assert registry.canonical_value("state", "ohio") is None
+    assert "city" not in registry.all_dimension_values()
+    assert registry.value_alternation("state") == r"(new[ _]?york|texas)"
+
+
+def test_agg_expr_adds_required_metrics(registry):
+    assert registry.agg_expr("sales") == "SUM(sales) AS sales"
+    assert registry.agg_expr("nonsense") == "SUM(sales) AS sales"
+    margin = registry.agg_expr("profit_margin")
+    assert margin.endswith("AS profit_margin") and margin.count(" AS ") > 1
+
+
+def test_loaded_values_are_pushed_into_the_registry(registry, monkeypatch):
+    monkeypatch.setattr(dimension_values, "_load_dimension_values",
+                        lambda: {"state": ["Texas", "Utah"]})
+    assert dimension_values.get_dimension_values() == {"state": ["Texas", "Utah"]}
+    assert registry.canonical_value("state", "utah") == "Utah"
+
+
+def test_failed_load_keeps_current_values(registry, monkeypatch):
+    before = registry.all_dimension_values()
+    calls = []
+
+    def boom():
+        calls.append(1)
+        raise RuntimeError("warehouse unavailable")
+
+    monkeypatch.setattr(dimension_values, "_load_dimension_values", boom)
+    assert dimension_values.get_dimension_values() == before
+    # backs off instead of hitting the warehouse on every page load
+    assert dimension_values.get_dimension_values() == before
+    assert calls == [1]
+
+
+def test_local_source_reads_the_bundled_extract(registry):
+    values = dimension_values.load_local_dimension_values(dims=["region", "segment"])
+    assert sorted(values["region"]) == ["Central", "East", "South", "West"]
+    assert sorted(values["segment"]) == ["Consumer", "Corporate", "Home Office"]
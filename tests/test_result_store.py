@@ -0,0 +1,67 @@
+import threading
+import pandas as pd
+import pytest
+from app import result_store
+from app.result_store import ResultManager
+
+
+def frame(n: int = 1000):
+    return pd.DataFrame({"x": range(n)})
+
+
+@pytest.fixture
+def results(tmp_path):
+    size = int(frame().memory_usage(deep=True).sum())
+    return ResultManager(budget_bytes=size, spill_dir=str(tmp_path), idle_seconds=3600)
+
+
+def test_over_budget_spills_lru_and_reloads(results, tmp_path):
+    results.put("a", frame())
+    results.put("b", frame())
+    assert [e["state"] for e in results.usage()["entries"]] == ["spilled", "memory"]
+    pdf, _ = results.get("a")
+    assert pdf.equals(frame())
+    assert results.reloads == 1 and results.usage()["in_memory"] == 1
+    results.release("a")
+    results.release("b")
+    assert not list(tmp_path.iterdir())
+
+
+def test_spill_write_does_not_hold_the_lock(results, monkeypatch):
+    writing, finish = threading.Event(), threading.Event()
+    real_dumps = result_store.dumps_df
+
+    def slow_dumps(pdf):
+        writing.set()
+        finish.wait(5)
+        return real_dumps(pdf)
+
+    monkeypatch.setattr(result_store, "dumps_df", slow_dumps)
+    results.put("a", frame())
+    spill = threading.Thread(target=results.put, args=("b", frame()))
+    spill.start()
+    assert writing.wait(5)
+    # other sessions keep working while "a" is being written
+    got = []
+    reader = threading.Thread(target=lambda: got.append(results.get("b")))
+    reader.start()
+    reader.join(2)
+    assert got and got[0][0].equals(frame())
+    finish.set()
+    spill.join(5)
+    assert results.usage()["spilled"] == 1
+
+
+def test_view_during_spill_keeps_result_in_memory(results, monkeypatch):
+    real_dumps = result_store.dumps_df
+
+    def dumps_and_view(pdf):
+        assert results.get("a")[0] is not None
+        return real_dumps(pdf)
+
+    monkeypatch.setattr(result_store, "dumps_df", dumps_and_view)
+    results.put("a", frame())
+    results.put("b", frame())
+    states = {e["session"]: e["state"] for e in results.usage()["entries"]}
+    assert states == {"a": "memory", "b": "memory"}
+    assert results.usage()["in_memory_bytes"] == 2 * results.budget_bytes
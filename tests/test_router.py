@@ -0,0 +1,50 @@
+import datetime as dt
+import json
+import pytest
+from providers import router, rules_provider
+from providers.rules_provider import RulesRefusal, TimeSeriesSpec
+
+LO, HI = dt.date(2014, 1, 3), dt.date(2017, 12, 30)
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    router.reset_stats()
+    yield
+    router.reset_stats()
+
+
+def hits(tier: str) -> tuple[int, int]:
+    (row,) = [r for r in router.stats() if r["tier"] == tier]
+    return row["calls"], row["hits"]
+
+
+def test_rules_refusal_is_a_hit_and_is_raised():
+    with pytest.raises(RulesRefusal, match="No data for 2030"):
+        router.translate("sales by month in 2030", "t", LO, HI)
+    assert hits("rules") == (1, 1)
+
+
+def test_other_value_errors_are_misses():
+    def broken_genie(*args):
+        return json.loads("<html>gateway timeout</html>")   # JSONDecodeError is a ValueError
+
+    with pytest.raises(ValueError):
+        router.translate("why did sales drop", "t", LO, HI,
+                         tiers=[("rules", router.rules_tier), ("genie", broken_genie)])
+    assert hits("rules") == (1, 0) and hits("genie") == (1, 0)
+
+
+def test_time_series_come_from_a_single_rules_pass(monkeypatch):
+    from app import pipeline
+
+    calls = []
+    real = rules_provider.translate
+    monkeypatch.setattr(rules_provider, "translate",
+                        lambda *a, **kw: calls.append(a) or real(*a, **kw))
+    sql_text, provider, spec = pipeline.translate_question("sales by month in west", LO, HI)
+    assert isinstance(spec, TimeSeriesSpec) and sql_text == spec.sql()
+    assert provider == "Rules (incremental time series)"
+    sql_text, provider, spec = pipeline.translate_question("sales by region", LO, HI)
+    assert spec is None and provider == "Rules" and "GROUP BY region" in sql_text
+    assert len(calls) == 2
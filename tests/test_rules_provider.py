@@ -0,0 +1,93 @@
+import datetime as dt
+import pytest
+from config.registry import REGISTRY
+from app.dimension_values import load_local_dimension_values
+from app.utils import is_safe_select
+from providers import router
+from providers.rules_provider import _lit
+from providers.value_index import ValueIndex
+
+LO, HI = dt.date(2014, 1, 3), dt.date(2017, 12, 30)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def superstore_values():
+    values = load_local_dimension_values()
+    # set_dimension_values() updates these in place: swap in copies, so the
+    # process-wide registry (and its version-keyed caches) is left as it was
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(REGISTRY, "_values", dict(REGISTRY._values))
+        mp.setattr(REGISTRY, "_value_alt", dict(REGISTRY._value_alt))
+        mp.setattr(REGISTRY, "version", REGISTRY.version)
+        REGISTRY.set_dimension_values(values)
+        yield values
+
+
+def rules(q: str) -> str | None:
+    sql_text = router.rules_tier(q, "t", LO, HI)
+    return " ".join(sql_text.split()) if sql_text else None
+
+
+def test_every_loaded_value_passes_the_guard(superstore_values):
+    answered = 0
+    for dim, values in superstore_values.items():
+        col = REGISTRY.dim_column[dim]
+        for value in values:
+            assert is_safe_select(f"SELECT SUM(profit) FROM t WHERE {col} = {_lit(value)}"), value
+            sql_text = rules(f"profit for {value.lower()}")
+            if sql_text:
+                answered += 1
+                assert is_safe_select(sql_text), sql_text
+    assert answered > 0.9 * sum(map(len, superstore_values.values()))
+
+
+def test_guard_still_scans_outside_literals():
+    assert is_safe_select("SELECT * FROM t WHERE customer_name = 'Grant Thornton'")
+    assert is_safe_select("SELECT * FROM t WHERE customer_name = 'Sean O\\'Donnell'")
+    assert not is_safe_select("SELECT 'x' FROM t WHERE 1 = 1 UNION SELECT grant FROM t")
+    assert not is_safe_select("SELECT 'a'; DROP TABLE t")
+
+
+def test_values_joined_by_and_become_in_list():
+    assert rules("show me sales in san francisco and seattle") == (
+        "SELECT SUM(sales) AS sales FROM t WHERE city IN ('San Francisco', 'Seattle')"
+    )
+    assert "state IN ('Texas', 'Ohio', 'Utah')" in rules("sales in texas, ohio and utah")
+    assert "region IN ('West', 'East')" in rules("sales by month in west and east")
+
+
+def test_unresolved_list_item_is_a_miss():
+    assert rules("sales in california and narnia") is None
+    assert rules("sales in california vs texas") is None
+    # a trailing metric/dimension is not a value list
+    assert "region = 'West'" in rules("sales in the west and profit by month")
+
+
+def test_fuzzy_value_tolerates_transposition():
+    assert "state = 'California'" in rules("sales in califronia")
+    assert "state = 'Texas'" in rules("sales in texsa")
+
+
+def test_short_words_are_not_edited_into_values():
+    index = ValueIndex({"region": ["West", "East"]})
+    assert index.lookup("east")[1] == "East"
+    assert index.lookup("yeast") is None
+
+
+def test_by_dimension_stops_before_a_value_span():
+    assert rules("sales by state for the furniture category") == (
+        "SELECT state, SUM(sales) AS sales FROM t WHERE category = 'Furniture' "
+        "GROUP BY state ORDER BY sales DESC"
+    )
+    assert "GROUP BY city" in rules("profit by city in texas")
+
+
+def test_unmodeled_intents_are_a_miss():
+    for q in ("how many orders in 2015", "average order value in 2016",
+              "number of orders in texas", "what was the best month in 2016",
+              "sales in 2016 vs 2017", "sales by month in 2016 vs 2017",
+              "compare profit between 2015 and 2016"):
+        assert rules(q) is None, q
+    assert rules("profit in texas") == (
+        "SELECT SUM(profit) AS profit FROM t WHERE state = 'Texas'"
+    )
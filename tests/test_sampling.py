@@ -0,0 +1,46 @@
+import datetime as dt, json
+import pandas as pd
+import pytest
+from config.settings import DASHBOARD_PATH, FQTN
+from app import pipeline
+from app.sampling import additive_columns, sample_sql, scale_estimate
+from providers import router
+
+T = FQTN
+
+
+def test_scaled_columns_follow_aliases_but_not_distinct_counts():
+    sql_text = (f"SELECT SUM(sales) total, COUNT(*) AS `n orders`, "
+                f"COUNT(DISTINCT customer_name) AS customers, AVG(sales) AS avg_sales FROM {T}")
+    assert additive_columns(sql_text) == ["total", "n orders"]
+    est = scale_estimate(pd.DataFrame({"total": [2.0], "n orders": [3], "customers": [40],
+                                       "avg_sales": [5.0]}), sql_text, percent=1)
+    assert est.iloc[0].tolist() == [200.0, 300.0, 40, 5.0]
+    assert est.attrs["approximate"]
+
+
+@pytest.mark.parametrize("sql_text", [
+    f"SELECT SUM(sales) FROM {T}",                                   # no output name
+    f"SELECT SUM(sales) - SUM(profit) AS cost FROM {T}",             # shape not understood
+    f"WITH t AS (SELECT SUM(sales) s FROM {T}) SELECT s FROM t",     # aggregated in a CTE
+    f"SELECT region, SUM(sales) s FROM {T} GROUP BY region HAVING SUM(sales) > 10",
+])
+def test_unscalable_queries_get_no_preview(sql_text):
+    assert additive_columns(sql_text) is None
+    assert pipeline.preview_sql(sql_text) is None
+
+
+def test_ratios_are_not_scaled():
+    sql_text = (f"SELECT category, CASE WHEN SUM(sales)=0 THEN NULL ELSE SUM(profit)/SUM(sales) END "
+                f"AS profit_margin, ROUND(SUM(sales), 2) AS sales FROM {T} GROUP BY category")
+    assert additive_columns(sql_text) == ["sales"]
+
+
+def test_every_rules_dashboard_query_can_be_previewed():
+    with open(DASHBOARD_PATH, encoding="utf-8") as f:
+        questions = json.load(f)
+    for q in questions:
+        sql_text = router.rules_tier(q, T, dt.date(2014, 1, 3), dt.date(2017, 12, 30))
+        if sql_text:
+            assert additive_columns(sql_text) is not None, sql_text
+            assert "TABLESAMPLE" in sample_sql(sql_text)
@@ -0,0 +1,166 @@
+import threading, time
+import pytest
+from app.scheduler import QueryScheduler, Ticket, Cancelled, PRIORITY_CHEAP, PRIORITY_ADHOC
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def wait_until(pred, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not pred():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+class Queued:
+    """Tickets waiting in background threads; each records its admission and
+    holds its slot until let go (or releases right away with `hold=False`)."""
+
+    def __init__(self, sched: QueryScheduler):
+        self.sched, self.admitted, self.threads = sched, [], []
+        self._go: dict[str, threading.Event] = {}
+
+    def add(self, name: str, user: str, priority: int, hold: bool = False) -> Ticket:
+        ticket = Ticket(user, priority)
+        self._go[name] = go = threading.Event()
+        if not hold:
+            go.set()
+
+        def run():
+            try:
+                with self.sched.slot(ticket):
+                    self.admitted.append(name)
+                    go.wait(5)
+            except Cancelled:
+                pass
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        wait_until(lambda: ticket.state != "new")
+        return ticket
+
+    def let_go(self, name: str):
+        self._go[name].set()
+
+    def join(self):
+        for name in self._go:
+            self.let_go(name)
+        for thread in self.threads:
+            thread.join(5)
+
+
+def test_cheap_queries_go_first(clock):
+    sched = QueryScheduler(1, aging=15, clock=clock)
+    q = Queued(sched)
+    q.add("running", "a", PRIORITY_ADHOC, hold=True)
+    q.add("adhoc", "b", PRIORITY_ADHOC)
+    q.add("cheap", "c", PRIORITY_CHEAP)
+    q.join()
+    assert q.admitted == ["running", "cheap", "adhoc"]
+
+
+def test_waiting_ages_adhoc_queries_up(clock):
+    sched = QueryScheduler(1, aging=15, clock=clock)
+    q = Queued(sched)
+    q.add("running", "a", PRIORITY_ADHOC, hold=True)
+    q.add("adhoc", "b", PRIORITY_ADHOC)
+    clock.now = 30.0
+    q.add("cheap", "c", PRIORITY_CHEAP)
+    q.join()
+    # aged into the cheap class, the older ad-hoc query wins on arrival order
+    assert q.admitted == ["running", "adhoc", "cheap"]
+
+
+def test_users_with_fewer_running_queries_go_first(clock):
+    sched = QueryScheduler(2, aging=15, clock=clock)
+    q = Queued(sched)
+    q.add("u1", "u", PRIORITY_CHEAP, hold=True)
+    q.add("w1", "w", PRIORITY_CHEAP, hold=True)
+    q.add("u2", "u", PRIORITY_CHEAP)
+    q.add("v1", "v", PRIORITY_CHEAP)
+    q.let_go("w1")
+    wait_until(lambda: len(q.admitted) >= 3)
+    assert q.admitted[2] == "v1"
+    q.join()
+    assert q.admitted[3] == "u2"
+
+
+def test_position_and_metrics(clock):
+    sched = QueryScheduler(1, aging=15, clock=clock)
+    q = Queued(sched)
+    q.add("running", "a", PRIORITY_CHEAP, hold=True)
+    adhoc = q.add("adhoc", "b", PRIORITY_ADHOC)
+    cheap = q.add("cheap", "c", PRIORITY_CHEAP)
+    assert (sched.position(cheap), sched.position(adhoc)) == (1, 2)
+    m = sched.metrics()
+    assert (m["running"], m["queue_depth"], m["queue_depth_cheap"], m["queue_depth_adhoc"]) == (1, 2, 1, 1)
+
+    clock.now = 10.0
+    q.join()
+    m = sched.metrics()
+    assert sched.position(cheap) == 0 and cheap.state == "done"
+    assert (m["admitted"], m["running"], m["queue_depth"], m["max_queue_depth"]) == (3, 0, 0, 2)
+    assert m["avg_wait_s_cheap"] == 5.0 and m["avg_wait_s_adhoc"] == 10.0
+
+
+def test_interrupted_waiter_leaves_the_queue(clock, monkeypatch):
+    sched = QueryScheduler(1, aging=15, clock=clock)
+    sched.acquire(Ticket("a", PRIORITY_CHEAP))
+
+    def interrupted(timeout=None):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(sched._cond, "wait", interrupted)
+    ticket = Ticket("b", PRIORITY_CHEAP)
+    with pytest.raises(KeyboardInterrupt):
+        sched.acquire(ticket)
+    assert ticket.state == "done" and sched.position(ticket) == 0
+    assert sched.metrics()["queue_depth"] == 0
+
+
+def test_cancelled_waiter_never_runs(clock):
+    sched = QueryScheduler(1, aging=15, clock=clock)
+    q = Queued(sched)
+    q.add("running", "a", PRIORITY_CHEAP, hold=True)
+    preview = q.add("preview", "b", PRIORITY_CHEAP)
+    q.add("exact", "b", PRIORITY_ADHOC)
+    sched.cancel(preview)
+    assert preview.state == "done" and sched.metrics()["queue_depth"] == 1
+    q.join()
+    assert q.admitted == ["running", "exact"]
+    assert sched.metrics()["cancelled"] == 1
+
+
+def test_cancelled_before_queueing_or_after_admission(clock):
+    sched = QueryScheduler(1, aging=15, clock=clock)
+    early = Ticket("a", PRIORITY_CHEAP)
+    sched.cancel(early)
+    with pytest.raises(Cancelled):
+        sched.acquire(early)
+
+    ran = []
+    late = Ticket("a", PRIORITY_CHEAP)
+    real_acquire = sched.acquire
+
+    def admitted_then_cancelled(ticket):
+        real_acquire(ticket)
+        sched.cancel(ticket)
+
+    sched.acquire = admitted_then_cancelled
+    with pytest.raises(Cancelled):
+        with sched.slot(late):
+            ran.append(1)
+    assert not ran and late.state == "done"
+    assert sched.metrics()["running"] == 0
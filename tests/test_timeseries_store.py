@@ -0,0 +1,93 @@
+import datetime as dt
+import pandas as pd
+import pytest
+from app import cache, timeseries_store
+from app.cache import loads_df_meta
+from providers.rules_provider import TimeSeriesSpec
+
+SPEC = TimeSeriesSpec("month", "SUM(sales) AS sales", ("region = 'West'",), "t")
+
+
+def months(*pairs):
+    return pd.DataFrame({
+        "month": [pd.Timestamp(m) for m, _ in pairs],
+        "sales": [float(v) for _, v in pairs],
+    })
+
+
+class FakeFetch:
+    """Stands in for the scheduled fetch: answers full and `since` queries."""
+
+    def __init__(self, full, delta=None):
+        self.full, self.delta, self.calls = full, delta, []
+
+    def __call__(self, sql_text):
+        self.calls.append(sql_text)
+        frame = self.delta if "order_date >= date" in sql_text else self.full
+        # the warehouse hands dates back as strings through some drivers
+        return frame.assign(month=frame["month"].dt.strftime("%Y-%m-%d"))
+
+
+@pytest.fixture
+def store(monkeypatch):
+    mem = cache.MemoryCache()
+    bounds = {"max": dt.date(2017, 2, 10)}
+    monkeypatch.setattr(timeseries_store, "get_cache", lambda: mem)
+    monkeypatch.setattr(timeseries_store, "get_date_bounds",
+                        lambda: (dt.date(2014, 1, 3), bounds["max"]))
+    return mem, bounds
+
+
+def test_unchanged_data_max_is_served_from_cache(store):
+    fetch = FakeFetch(months(("2017-01-01", 10), ("2017-02-01", 5)))
+    first = timeseries_store.get_series(SPEC, fetch=fetch)
+    again = timeseries_store.get_series(SPEC, fetch=fetch)
+    assert len(fetch.calls) == 1 and "order_date >=" not in fetch.calls[0]
+    assert again.equals(first)
+
+
+def test_new_data_fetches_only_the_tail(store):
+    mem, bounds = store
+    fetch = FakeFetch(
+        months(("2016-12-01", 7), ("2017-01-01", 10), ("2017-02-01", 5)),
+        delta=months(("2017-02-01", 8), ("2017-03-01", 2)),
+    )
+    timeseries_store.get_series(SPEC, fetch=fetch)
+    bounds["max"] = dt.date(2017, 3, 4)
+    df = timeseries_store.get_series(SPEC, fetch=fetch)
+
+    assert "order_date >= date '2017-02-01'" in fetch.calls[-1]
+    # periods before `since` are kept, the re-aggregated tail replaces the old one
+    assert df.equals(months(("2016-12-01", 7), ("2017-01-01", 10),
+                            ("2017-02-01", 8), ("2017-03-01", 2)))
+    (blob,) = [v for _, v in mem._data.values()]
+    stored, meta = loads_df_meta(blob)
+    assert meta == {"data_max": dt.date(2017, 3, 4)}
+    assert stored.equals(df)
+
+
+def test_missing_or_unreadable_entry_is_a_full_refetch(store):
+    mem, _ = store
+    fetch = FakeFetch(months(("2017-01-01", 10)))
+    timeseries_store.get_series(SPEC, fetch=fetch)
+    (key,) = mem._data
+    mem.set(key, b"not parquet")
+    timeseries_store.get_series(SPEC, fetch=fetch)
+    mem.delete(key)
+    timeseries_store.get_series(SPEC, fetch=fetch)
+    assert len(fetch.calls) == 3
+    assert not any("order_date >=" in sql_text for sql_text in fetch.calls)
+
+
+def test_moving_window_keeps_one_entry(store):
+    mem, bounds = store
+    spec = SPEC._replace(last_n_months=3, data_max=dt.date(2017, 2, 10))
+    fetch = FakeFetch(months(("2017-01-01", 10)))
+    timeseries_store.get_series(spec, fetch=fetch)
+    bounds["max"] = dt.date(2017, 3, 4)
+    timeseries_store.get_series(spec, fetch=fetch)
+
+    assert len(mem._data) == 1
+    # the window start moved too: re-run whole, bounded by the new data_max
+    assert "add_months(date '2017-03-04', -3)" in fetch.calls[-1]
+    assert "order_date >=" not in fetch.calls[-1]
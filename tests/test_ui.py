@@ -0,0 +1,11 @@
+import pandas as pd
+from app import ui
+
+
+def test_text_numbers_are_charted_without_normalized_attrs(monkeypatch):
+    charts = []
+    monkeypatch.setattr(ui.st, "altair_chart", lambda chart, **kw: charts.append(chart))
+    pdf = pd.DataFrame({"region": ["West", "East"], "sales": ["1.5", "2.5"]})
+    assert not pdf.attrs.get("normalized")
+    ui.render_quick_chart(pdf)
+    assert len(charts) == 1